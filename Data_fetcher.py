@@ -1,6 +1,274 @@
 import requests
 import json
 import random
+import time
+import threading
+import sys
+import os
+import hashlib
+import asyncio
+import codecs
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from requests.adapters import HTTPAdapter
+
+
+# --- Helper: Retry Policy (exponential back-off with jitter) ---
+class RetryPolicy:
+    """
+    Decides whether a failed request should be tried again, and how long to wait first.
+
+    The wait doubles after every attempt (exponential back-off) up to `max_backoff`,
+    and a random "jitter" picks a time between 0 and that limit, so many clients
+    retrying at once don't all hit the server at the same moment.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=10.0,
+                 retry_statuses=(500, 502, 503, 504), retry_on_timeout=True):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+        self.retry_on_timeout = retry_on_timeout
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (0 = first retry), with full jitter."""
+        limit = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, limit)
+
+
+# --- Helper: Per-Host Rate Limiter (token bucket) ---
+class HostRateLimiter:
+    """
+    Allows at most `rate` requests per second to each host, with short bursts of
+    up to `burst` requests. Thread-safe, so several threads can share one limiter.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> (tokens left, time of last update)
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str):
+        """Blocks until a request to `host` is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                # Refill the bucket for the time that has passed
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+# --- Helper: Response Cache (in-memory LRU + TTL, optional disk store) ---
+class ResponseCache:
+    """
+    Remembers JSON responses so repeated lookups don't always go to the network.
+
+    - In memory: an LRU (least recently used) dictionary of at most `max_entries`.
+    - Optional on disk: one small JSON file per URL in `disk_dir`, so the cache
+      survives a restart.
+    - Each entry keeps the server's validators (ETag / Last-Modified), so once it
+      is stale we can ask "has it changed?" (a conditional request) instead of
+      downloading it again. An unchanged resource costs a tiny 304 reply.
+    - Honours Cache-Control: 'no-store' is never cached, 'no-cache' is always
+      revalidated, and 'max-age=N' sets how long the entry stays fresh.
+    """
+
+    def __init__(self, max_entries=256, default_ttl=60.0, disk_dir=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl  # Used when the server doesn't say (no max-age)
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()   # url -> entry dict
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, url):
+        return os.path.join(self.disk_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        """Returns the cached entry for a url (fresh or stale), or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return entry
+        if self.disk_dir and os.path.exists(self._disk_path(url)):
+            try:
+                with open(self._disk_path(url), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+            self._remember(url, entry)
+            return entry
+        return None
+
+    def _remember(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def store(self, url, data, headers):
+        """Saves a fresh response (unless the server said no-store). Returns the entry or None."""
+        cache_control = parse_cache_control(headers.get("Cache-Control", ""))
+        if "no-store" in cache_control:
+            return None
+        ttl = self.default_ttl
+        if "max-age" in cache_control:
+            try:
+                ttl = float(cache_control["max-age"])
+            except ValueError:
+                pass
+        if "no-cache" in cache_control:
+            ttl = 0  # May be stored, but must be revalidated before every use
+        entry = {
+            "data": data,
+            "stored_at": time.time(),
+            "ttl": ttl,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        self._remember(url, entry)
+        self._write_to_disk(url, entry)
+        return entry
+
+    def refresh(self, url, entry, headers):
+        """A 304 reply means our copy is still good: restart its freshness clock."""
+        cache_control = parse_cache_control(headers.get("Cache-Control", ""))
+        if "max-age" in cache_control:
+            try:
+                entry["ttl"] = float(cache_control["max-age"])
+            except ValueError:
+                pass
+        entry["stored_at"] = time.time()
+        entry["etag"] = headers.get("ETag") or entry.get("etag")
+        entry["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+        self._remember(url, entry)
+        self._write_to_disk(url, entry)
+
+    def _write_to_disk(self, url, entry):
+        if not self.disk_dir:
+            return
+        temp_path = self._disk_path(url) + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, self._disk_path(url))
+
+    @staticmethod
+    def is_fresh(entry, max_age=None):
+        """
+        True if the entry can be used without asking the server.
+        max_age (seconds) lets the caller choose their own freshness; otherwise the
+        server's max-age (or the cache's default TTL) decides.
+        """
+        age = time.time() - entry["stored_at"]
+        limit = entry["ttl"] if max_age is None else max_age
+        return age <= limit
+
+    @staticmethod
+    def validators(entry):
+        """Headers for a conditional request based on what the server told us last time."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+def parse_cache_control(value):
+    """'public, max-age=60, no-cache' -> {'public': None, 'max-age': '60', 'no-cache': None}"""
+    directives = {}
+    for part in value.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        key, _, argument = part.partition("=")
+        directives[key.strip()] = argument.strip().strip('"') or None
+    return directives
+
+
+# --- Helper: Streaming JSON Decoding ---
+class StreamLimitError(Exception):
+    """Raised when a response is bigger than allowed or takes longer than its deadline."""
+
+
+def json_charset(content_type):
+    """
+    The encoding of a JSON body: the charset named in its Content-Type header, else
+    UTF-8 (RFC 8259). requests' own guess (response.encoding) is ISO-8859-1 for any
+    text/* type without a charset, which would garble everything that isn't ASCII.
+    """
+    for part in (content_type or "").split(";")[1:]:
+        key, _, value = part.partition("=")
+        if key.strip().lower() == "charset":
+            try:
+                return codecs.lookup(value.strip().strip('"')).name
+            except LookupError:
+                break  # Unknown charset name: fall back to the default
+    return "utf-8"
+
+
+def iter_json_records(chunks, encoding="utf-8"):
+    """
+    Turns a stream of byte chunks into JSON records, one at a time, without ever
+    holding the whole body in memory. Understands:
+      - a JSON array:  [{"a": 1}, {"a": 2}, ...]  -> yields each element
+      - NDJSON:        {"a": 1}\n{"a": 2}\n...    -> yields each line's value
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()  # Copes with characters split across chunks
+    buffer = ""
+    in_array = None  # Unknown until we see the first non-space character
+
+    def take_records(final):
+        nonlocal buffer, in_array
+        position = 0
+        while True:
+            # Skip whitespace (and, inside an array, the commas between elements)
+            while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ",")):
+                position += 1
+            if position == len(buffer):
+                break
+            if in_array is None:
+                in_array = buffer[position] == "["
+                if in_array:
+                    position += 1
+                    continue
+            if in_array and buffer[position] == "]":
+                position = len(buffer)  # End of the array: ignore anything after it
+                break
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # Probably cut off mid-record: wait for more data
+            # A value that runs to the very end of the buffer (e.g. the number "12" of "123")
+            # might continue in the next chunk, so only trust it once something follows it.
+            if end == len(buffer) and not final:
+                break
+            yield record
+            position = end
+        buffer = buffer[position:]
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        yield from take_records(final=False)
+    buffer += text_decoder.decode(b"", final=True)
+    yield from take_records(final=True)
+
 
 # --- OOP CLASS: API Fetcher ---
 class APIFetcher:
@@ -9,27 +277,216 @@ class APIFetcher:
     common network errors and JSON parsing for various public APIs.
     """
     
-    def __init__(self, name="Generic Fetcher"):
+    # Default size of the connection pool (connections kept open per host)
+    DEFAULT_POOL_SIZE = 10
+
+    # Largest response body we are willing to read (bytes), and the read size when streaming
+    MAX_PAYLOAD_BYTES = 10 * 1024 * 1024
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    # API endpoints (class attributes, so a test can point an instance at a local server)
+    JOKE_API_URL = "https://api.chucknorris.io/jokes/random"
+    QUOTE_API_URL = "https://api.quotable.io/random"
+
+    def __init__(self, name="Generic Fetcher", retry_policy=None, rate_limit=None,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=10, session=None, cache=None):
         # Instance attribute for identification
         self.name = name
-        # Class attributes (shared) could be used here for API keys/rate limits
+        self.timeout = timeout
+        # Optional ResponseCache; without one every call goes to the network (as before)
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Optional: maximum requests per second to any single host
+        self.rate_limiter = HostRateLimiter(rate_limit) if rate_limit else None
+
+        # ONE Session for all requests: it keeps TCP/TLS connections open (keep-alive)
+        # and reuses them, instead of opening a new connection for every call.
+        self.session = session or requests.Session()
+        # The adapter holds the connection pool. Retries are handled by _make_request
+        # itself (max_retries=0 here), so back-off and jitter are under our control.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+
+        # Requests currently on the wire (url -> Future), so identical URLs requested
+        # at the same time share ONE network call (request coalescing)
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+        # Optional ContentPrefetcher (see start_prefetching)
+        self.prefetcher = None
+
+    def close(self):
+        """Stops any background prefetching and closes the pooled connections."""
+        if self.prefetcher:
+            self.prefetcher.close()
+            self.prefetcher = None
+        self.session.close()
+
+    def start_prefetching(self, capacity: int = 10, low_water: int = 3, wait_timeout: float = 0.05):
+        """
+        Starts background workers that keep jokes and quotes ready in memory, so
+        fetch_chuck_norris_joke / fetch_inspirational_quote return without waiting
+        for the network. Returns the ContentPrefetcher (for its stats).
+        """
+        if self.prefetcher is None:
+            self.prefetcher = ContentPrefetcher(self, [self.JOKE_API_URL, self.QUOTE_API_URL],
+                                                capacity=capacity, low_water=low_water,
+                                                wait_timeout=wait_timeout)
+            self.prefetcher.start()
+        return self.prefetcher
+
+    def _fetch_content(self, url: str, max_age: float = None) -> dict or None:
+        """Serves from the prefetch buffer when one is running for `url`, else fetches now."""
+        if self.prefetcher and url in self.prefetcher:
+            return self.prefetcher.get(url)
+        return self._make_request(url, max_age=max_age)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    def _make_request(self, url: str) -> dict or None:
+    def _get_with_retries(self, url, headers=None, timeout=None, deadline_at=None, **kwargs):
+        """
+        Sends a GET on the pooled session, respecting the rate limit. Server errors
+        (5xx), timeouts and dropped connections are retried according to
+        self.retry_policy. Returns the final response; raises if retries run out.
+
+        deadline_at (a time.monotonic() value) bounds ALL attempts together: each one
+        may only wait for the time that is left, and there is no retry (or back-off
+        sleep) that would end after it.
+        """
+        host = urlsplit(url).netloc
+        policy = self.retry_policy
+
+        def time_left():
+            return None if deadline_at is None else deadline_at - time.monotonic()
+
+        for attempt in range(policy.max_retries + 1):
+            retries_left = attempt < policy.max_retries
+
+            # Respect the per-host rate limit (if one is set)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(host)
+
+            attempt_timeout = timeout or self.timeout
+            remaining = time_left()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout(f"Deadline passed before attempt {attempt + 1}.")
+                attempt_timeout = min(attempt_timeout, remaining)
+
+            try:
+                response = self.session.get(url, headers=headers, timeout=attempt_timeout, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as err:
+                wait = policy.backoff(attempt)
+                if not (retries_left and policy.retry_on_timeout) or (
+                        deadline_at is not None and time_left() <= wait):
+                    raise
+                print(f"[{self.name}] {type(err).__name__}, retrying in {wait:.2f}s...")
+                time.sleep(wait)
+                continue
+
+            # Server-side errors are often temporary: back off and try again (if there's time)
+            wait = policy.backoff(attempt)
+            if (response.status_code in policy.retry_statuses and retries_left and
+                    (deadline_at is None or time_left() > wait)):
+                print(f"[{self.name}] HTTP {response.status_code}, retrying in {wait:.2f}s...")
+                response.close()
+                time.sleep(wait)
+                continue
+            return response
+
+    def _iter_body(self, response, max_bytes, deadline_at):
+        """
+        Yields the response body in chunks, stopping with StreamLimitError once more
+        than max_bytes have arrived or the overall deadline (a time.monotonic() value)
+        has passed. The per-read `timeout` alone can't catch a server that keeps
+        sending a trickle of data forever.
+        """
+        received = 0
+        for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                raise StreamLimitError(f"Response is larger than {max_bytes} bytes.")
+            if deadline_at is not None and time.monotonic() > deadline_at:
+                raise StreamLimitError("Response did not finish before its deadline.")
+            yield chunk
+
+    def _stream_records(self, response, max_bytes, deadline_at):
+        """Generator over the records of an open streaming response; closes it when done."""
+        try:
+            yield from iter_json_records(self._iter_body(response, max_bytes, deadline_at),
+                                         encoding=json_charset(response.headers.get("Content-Type")))
+        finally:
+            response.close()
+
+    def _make_request(self, url: str, max_age: float = None, stream: bool = False,
+                      max_bytes: int = None, deadline: float = None) -> dict or None:
         """
         Internal, protected method to handle the core network request and error handling.
         Returns the parsed JSON dictionary on success, or None on failure.
+
+        With a cache: a fresh cached copy is returned without any network traffic
+        (max_age lets the caller decide how old is acceptable, in seconds). A stale
+        copy is revalidated with If-None-Match / If-Modified-Since.
+
+        max_bytes caps the body size (default MAX_PAYLOAD_BYTES) and deadline (seconds)
+        limits the whole request, not just each socket read.
+
+        stream=True: for big JSON arrays or NDJSON. Returns a generator that decodes
+        records one by one as they arrive, so memory stays bounded (the cache is not
+        used). Connection errors still give None; a limit hit while iterating raises
+        StreamLimitError.
         """
+        max_bytes = self.MAX_PAYLOAD_BYTES if max_bytes is None else max_bytes
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+
+        cached = self.cache.get(url) if self.cache and not stream else None
+        if cached and ResponseCache.is_fresh(cached, max_age):
+            print(f"\n[{self.name}] Using cached data for: {url}")
+            return cached["data"]
+
         print(f"\n[{self.name}] Attempting to fetch data from: {url}")
+        response = None
         
         try:
-            # Step 1: Make the HTTP GET request with a timeout
-            response = requests.get(url, timeout=10) 
+            # Step 1: Make the HTTP GET request (conditional if we hold a stale copy).
+            # stream=True means only the headers are read here; the body comes later.
+            headers = ResponseCache.validators(cached) if cached else None
+            response = self._get_with_retries(url, headers=headers, deadline_at=deadline_at, stream=True)
+
+            # 304 Not Modified: our cached copy is still correct
+            if response.status_code == 304 and cached:
+                print(f"[{self.name}] Not modified, reusing cached data.")
+                self.cache.refresh(url, cached, response.headers)
+                response.close()
+                return cached["data"]
             
             # Step 2: Check for a successful response (raises HTTPError for 4xx/5xx codes)
             response.raise_for_status() 
+
+            # Refuse an oversized body before reading any of it, when the server tells us its size
+            try:
+                declared_size = int(response.headers.get("Content-Length") or 0)
+            except ValueError:
+                declared_size = 0  # A malformed header: the size is unknown, the read limit still applies
+            if declared_size > max_bytes:
+                response.close()
+                raise StreamLimitError(f"Response is {declared_size} bytes (limit {max_bytes}).")
+
+            if stream:
+                return self._stream_records(response, max_bytes, deadline_at)
             
-            # Step 3: Parse the JSON data
-            return response.json()
+            # Step 3: Read (within the limits) and parse the JSON data, keeping a copy if caching is on
+            body = b"".join(self._iter_body(response, max_bytes, deadline_at))
+            data = json.loads(body)
+            if self.cache:
+                self.cache.store(url, data, response.headers)
+            return data
             
         except requests.exceptions.HTTPError as err_h:
             print(f"[{self.name}] HTTP Error ({response.status_code}): {err_h}")
@@ -41,26 +498,116 @@ class APIFetcher:
             print(f"[{self.name}] Unknown Request Error: {err}")
         except json.JSONDecodeError:
             print(f"[{self.name}] Error: Failed to decode JSON response.")
-            
+        except StreamLimitError as err_l:
+            print(f"[{self.name}] Limit Error: {err_l}")
+
+        if response is not None:
+            response.close()  # Don't leave a half-read body holding a pooled connection
         return None # Return None if any error occurred
 
-    def fetch_chuck_norris_joke(self) -> str:
-        """Fetches a random joke using the internal request method."""
-        api_url = "https://api.chucknorris.io/jokes/random"
-        data = self._make_request(api_url)
+    def _fetch_coalesced(self, url: str, max_age: float = None) -> dict or None:
+        """
+        Like _make_request, but if another thread is already fetching the same URL
+        we wait for its result instead of sending a second identical request.
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(url)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[url] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = self._make_request(url, max_age=max_age)
+        except Exception as err:
+            # _make_request already maps network errors to None; anything else
+            # must not leave the waiting threads hanging
+            print(f"[{self.name}] Unexpected error for {url}: {err}")
+            result = None
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[url]
+        future.set_result(result)
+        return result
+
+    def fetch_many(self, urls, max_concurrency: int = 8, ordered: bool = True, max_age: float = None):
+        """
+        Fetches many URLs at once on a thread pool (network waits overlap instead of
+        adding up). Duplicate URLs are fetched only once.
+
+        ordered=True  -> returns a list of results in the same order as `urls`.
+        ordered=False -> returns a generator of (url, result) pairs as each one finishes.
+        A failed request gives None for that URL; the others are unaffected.
+
+        Tip: keep max_concurrency <= pool_size, otherwise extra connections are
+        opened and thrown away instead of being reused.
+        """
+        urls = list(urls)
+        unique_urls = list(dict.fromkeys(urls))  # Deduplicate, keeping the first-seen order
+
+        if ordered:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                results = dict(zip(unique_urls, executor.map(
+                    lambda url: self._fetch_coalesced(url, max_age), unique_urls)))
+            return [results[url] for url in urls]
+        return self._fetch_as_completed(unique_urls, max_concurrency, max_age)
+
+    def _fetch_as_completed(self, unique_urls, max_concurrency, max_age):
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {executor.submit(self._fetch_coalesced, url, max_age): url for url in unique_urls}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    async def fetch_many_async(self, urls, max_concurrency: int = 8, ordered: bool = True, max_age: float = None):
+        """
+        asyncio version of fetch_many, for callers that already run an event loop.
+        requests is a blocking library, so each call runs in a worker thread
+        (loop.run_in_executor) while a Semaphore caps how many run at once.
+
+        ordered=True  -> list of results in input order.
+        ordered=False -> list of (url, result) pairs in the order they finished.
+        """
+        urls = list(urls)
+        unique_urls = list(dict.fromkeys(urls))
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            async def fetch_one(url):
+                async with semaphore:
+                    result = await loop.run_in_executor(executor, self._fetch_coalesced, url, max_age)
+                return url, result
+
+            tasks = [asyncio.ensure_future(fetch_one(url)) for url in unique_urls]
+            if ordered:
+                results = dict(await asyncio.gather(*tasks))
+                return [results[url] for url in urls]
+            return [await task for task in asyncio.as_completed(tasks)]
+
+    def fetch_chuck_norris_joke(self, max_age: float = None) -> str:
+        """
+        Fetches a random joke using the internal request method.
+        max_age: accept a cached joke up to this many seconds old (needs a cache).
+        """
+        api_url = self.JOKE_API_URL
+        data = self._fetch_content(api_url, max_age=max_age)
         
         if data:
             # The joke text is typically under the 'value' key
             return data.get('value', 'Joke content not found.')
         return "Failed to retrieve joke."
 
-    def fetch_inspirational_quote(self) -> str:
+    def fetch_inspirational_quote(self, max_age: float = None) -> str:
         """
         Fetches a random inspirational quote from a reliable public API.
         The API returns a single dictionary object.
+        max_age: accept a cached quote up to this many seconds old (needs a cache).
         """
-        api_url = "https://api.quotable.io/random" # Updated API endpoint
-        data_dict = self._make_request(api_url) # Renamed variable for clarity of new API structure
+        api_url = self.QUOTE_API_URL # Updated API endpoint
+        data_dict = self._fetch_content(api_url, max_age=max_age) # Renamed variable for clarity of new API structure
         
         if data_dict and isinstance(data_dict, dict):
             # The quotable.io API uses 'content' for the text and 'author'
@@ -71,6 +618,106 @@ class APIFetcher:
         return "Failed to retrieve quote."
 
 
+# --- Helper: Background Prefetch Buffer ---
+class ContentPrefetcher:
+    """
+    Keeps a small buffer of ready-to-serve API responses for each endpoint, so a
+    caller gets an item from memory instead of waiting for a network round trip.
+
+    - One background worker thread per endpoint refills its buffer up to
+      `capacity` whenever it drops below `low_water`.
+    - get() pops the next item. If the buffer is empty it waits at most
+      `wait_timeout` seconds, then falls back to the fetcher's cache or the last
+      item served (stale, but better than blocking on a slow upstream).
+    - A failing upstream makes the worker back off (retry_delay) instead of spinning.
+    """
+
+    def __init__(self, fetcher, urls, capacity=10, low_water=3, wait_timeout=0.05, retry_delay=1.0):
+        self.fetcher = fetcher
+        self.capacity = capacity
+        self.low_water = low_water
+        self.wait_timeout = wait_timeout
+        self.retry_delay = retry_delay
+        self._buffers = {url: deque() for url in urls}
+        self._last_served = {}
+        self._wake = {url: threading.Event() for url in urls}  # Set = "please refill"
+        self._condition = threading.Condition()                # Notified when an item arrives
+        self._stopping = threading.Event()
+        self._threads = []
+        self.stats = {"served": 0, "fallback": 0, "missed": 0, "fetched": 0}
+
+    def __contains__(self, url):
+        return url in self._buffers
+
+    def start(self):
+        for url in self._buffers:
+            self._wake[url].set()  # Fill every buffer straight away
+            thread = threading.Thread(target=self._refill_loop, args=(url,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self):
+        self._stopping.set()
+        for event in self._wake.values():
+            event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def buffered(self, url):
+        """How many items are ready for `url` right now."""
+        with self._condition:
+            return len(self._buffers[url])
+
+    def _refill_loop(self, url):
+        buffer = self._buffers[url]
+        while not self._stopping.is_set():
+            self._wake[url].wait()
+            self._wake[url].clear()
+            while not self._stopping.is_set() and self.buffered(url) < self.capacity:
+                # max_age=0: every prefetched item must be a new response, not a cache hit
+                data = self.fetcher._make_request(url, max_age=0)
+                if data is None:
+                    # Upstream is failing: wait a bit, then try again
+                    self._stopping.wait(self.retry_delay)
+                    continue
+                with self._condition:
+                    buffer.append(data)
+                    self.stats["fetched"] += 1
+                    self._condition.notify_all()
+
+    def get(self, url, timeout: float = None):
+        """
+        Returns the next buffered item for `url`, waiting at most `timeout`
+        (default: wait_timeout) seconds. Falls back to cached/stale data, or None.
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        buffer = self._buffers[url]
+        with self._condition:
+            if not buffer:
+                self._wake[url].set()
+                self._condition.wait_for(lambda: buffer, timeout=timeout)
+            if buffer:
+                data = buffer.popleft()
+                self._last_served[url] = data
+                self.stats["served"] += 1
+                if len(buffer) < self.low_water:
+                    self._wake[url].set()  # Running low: ask the worker for more
+                return data
+
+            # Nothing arrived in time: serve the freshest thing we have, even if stale
+            cached = self.fetcher.cache.get(url) if self.fetcher.cache else None
+            stale = cached["data"] if cached else self._last_served.get(url)
+            self.stats["fallback" if stale is not None else "missed"] += 1
+            return stale
+
+
 # --- Execution and Demonstration ---
 
 def run_api_demo():
@@ -97,5 +744,253 @@ def run_api_demo():
     print("✅ Assertions passed: Data was successfully retrieved from both APIs.")
 
 
+# --- Local Stand-in Server (for testing without the internet) ---
+
+class LocalAPIHandler(BaseHTTPRequestHandler):
+    """
+    A tiny fake API, served by Python's built-in http.server:
+      /jokes/random      -> {"value": "..."}             (like api.chucknorris.io)
+      /random            -> {"content": "...", "author"} (like api.quotable.io)
+      /flaky?fail=N      -> HTTP 503 for the first N calls, then JSON
+      /slow?delay=S      -> JSON after waiting S seconds
+      /cached?max_age=N  -> JSON with ETag + Cache-Control, or 304 if the client's copy matches
+      /records?count=N&format=array|ndjson&delay=S&type=T
+                         -> N records, streamed with no Content-Length, S seconds apart
+                            (T overrides the Content-Type, e.g. text/plain)
+      /bad-length        -> JSON with a Content-Length header that isn't a number
+    """
+    # Shared between requests: how many times each /flaky URL has been called
+    flaky_calls = {}
+    flaky_lock = threading.Lock()
+    # How many full bodies /cached has sent (a 304 doesn't count)
+    cached_bodies_sent = 0
+    CACHED_ETAG = '"quote-v1"'
+
+    def _send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        if parts.path == "/jokes/random":
+            self._send_json({"value": "Chuck Norris can unit test an entire application with a single assert."})
+        elif parts.path == "/random":
+            self._send_json({"content": "Simplicity is prerequisite for reliability.", "author": "Edsger Dijkstra"})
+        elif parts.path == "/flaky":
+            with LocalAPIHandler.flaky_lock:
+                calls = LocalAPIHandler.flaky_calls.get(self.path, 0) + 1
+                LocalAPIHandler.flaky_calls[self.path] = calls
+            if calls <= int(query.get("fail", 2)):
+                self._send_json({"error": "try again"}, status=503)
+            else:
+                self._send_json({"value": f"Succeeded on call {calls}"})
+        elif parts.path == "/bad-length":
+            body = json.dumps({"value": "Content-Length is not a number"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "lots")
+            self.end_headers()
+            self.wfile.write(body)
+            self.close_connection = True
+        elif parts.path == "/slow":
+            time.sleep(float(query.get("delay", 0.5)))
+            self._send_json({"value": f"Slow response ({query.get('delay', 0.5)}s)"})
+        elif parts.path == "/cached":
+            cache_headers = {"ETag": self.CACHED_ETAG, "Cache-Control": f"max-age={query.get('max_age', 60)}"}
+            if self.headers.get("If-None-Match") == self.CACHED_ETAG:
+                self.send_response(304)
+                for name, value in cache_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            with LocalAPIHandler.flaky_lock:
+                LocalAPIHandler.cached_bodies_sent += 1
+            self._send_json({"value": "Cache me if you can."}, headers=cache_headers)
+        elif parts.path == "/records":
+            count, delay = int(query.get("count", 1000)), float(query.get("delay", 0))
+            as_array = query.get("format", "ndjson") == "array"
+            self.send_response(200)
+            self.send_header("Content-Type", query.get("type") or
+                             ("application/json" if as_array else "application/x-ndjson"))
+            self.end_headers()  # No Content-Length: the body ends when the connection closes
+            try:
+                self.wfile.write(b"[" if as_array else b"")
+                for i in range(count):
+                    record = json.dumps({"id": i, "value": f"récord {i}"}, ensure_ascii=False)
+                    separator = ("," if i else "") if as_array else ""
+                    self.wfile.write((separator + record + ("" if as_array else "\n")).encode("utf-8"))
+                    if delay:
+                        self.wfile.flush()
+                        time.sleep(delay)
+                self.wfile.write(b"]" if as_array else b"")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client stopped reading (e.g. it hit its payload limit)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def log_message(self, format, *args):
+        pass  # Keep the demo output clean
+
+
+def start_local_api_server(handler_class=LocalAPIHandler):
+    """
+    Starts the stand-in server on a free port in a background thread.
+    Returns (server, base_url); call server.shutdown() when finished.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_local_demo():
+    """Same checks as run_api_demo, plus retries and rate limiting, against the local server."""
+    server, base_url = start_local_api_server()
+    try:
+        with APIFetcher(name="Local Test Bot", retry_policy=RetryPolicy(backoff_factor=0.05),
+                        rate_limit=20) as fetcher:
+            fetcher.JOKE_API_URL = f"{base_url}/jokes/random"
+            fetcher.QUOTE_API_URL = f"{base_url}/random"
+            joke_result = fetcher.fetch_chuck_norris_joke()
+            quote_result = fetcher.fetch_inspirational_quote()
+
+            # The flaky endpoint fails twice with 503, so it only works thanks to the retries
+            flaky_result = fetcher._make_request(f"{base_url}/flaky?fail=2")
+
+            # 10 requests at 20 requests/sec (burst of 1) must take at least ~0.45 seconds
+            start = time.perf_counter()
+            for _ in range(10):
+                fetcher._make_request(f"{base_url}/jokes/random")
+            rate_limited_time = time.perf_counter() - start
+
+        # Caching: max-age=0 makes every use a revalidation, which the server answers with 304
+        with APIFetcher(name="Caching Bot", cache=ResponseCache(default_ttl=30)) as cached_fetcher:
+            first_cached = cached_fetcher._make_request(f"{base_url}/cached?max_age=0")
+            revalidated = cached_fetcher._make_request(f"{base_url}/cached?max_age=0")
+            # The caller can also accept a copy up to 60s old, which skips the network entirely
+            from_memory = cached_fetcher._make_request(f"{base_url}/cached?max_age=0", max_age=60)
+            bodies_sent = LocalAPIHandler.cached_bodies_sent
+
+        # Batch fetching: input order is kept, duplicates share one request, a 404 becomes None
+        with APIFetcher(name="Batch Bot") as batch_fetcher:
+            batch_urls = [f"{base_url}/slow?delay=0.2", f"{base_url}/missing", f"{base_url}/slow?delay=0.2"]
+            start = time.perf_counter()
+            batch_results = batch_fetcher.fetch_many(batch_urls, max_concurrency=4)
+            batch_time = time.perf_counter() - start
+            async_results = asyncio.run(batch_fetcher.fetch_many_async(batch_urls, max_concurrency=4))
+
+        # Prefetching: a 0.2s upstream, but buffered items are served from memory
+        with APIFetcher(name="Prefetch Bot") as prefetch_fetcher:
+            prefetch_fetcher.JOKE_API_URL = f"{base_url}/slow?delay=0.2"
+            prefetch_fetcher.QUOTE_API_URL = f"{base_url}/random"
+            prefetcher = prefetch_fetcher.start_prefetching(capacity=3, low_water=1, wait_timeout=0.01)
+            while prefetcher.buffered(prefetch_fetcher.JOKE_API_URL) < 3:
+                time.sleep(0.05)
+            start = time.perf_counter()
+            prefetched_jokes = [prefetch_fetcher.fetch_chuck_norris_joke() for _ in range(3)]
+            prefetch_time = time.perf_counter() - start
+            # The buffer is now empty and the upstream is slow: the last item is served again
+            stale_joke = prefetch_fetcher.fetch_chuck_norris_joke()
+            prefetch_stats = dict(prefetcher.stats)
+
+        # Streaming: records are decoded as they arrive; limits stop oversized or endless bodies
+        with APIFetcher(name="Streaming Bot") as stream_fetcher:
+            ndjson_count = sum(1 for _ in stream_fetcher._make_request(f"{base_url}/records?count=20000", stream=True))
+            array_ids = [record["id"] for record in
+                         stream_fetcher._make_request(f"{base_url}/records?count=20000&format=array", stream=True)]
+            too_big = stream_fetcher._make_request(f"{base_url}/records?count=20000", max_bytes=64 * 1024)
+            try:
+                for _ in stream_fetcher._make_request(f"{base_url}/records?count=50&delay=0.05",
+                                                      stream=True, deadline=0.5):
+                    pass
+                deadline_enforced = False
+            except StreamLimitError:
+                deadline_enforced = True
+            # text/* without a charset is still UTF-8 JSON (requests would guess ISO-8859-1)
+            text_records = list(stream_fetcher._make_request(f"{base_url}/records?count=3&type=text/plain",
+                                                             stream=True))
+            # A malformed Content-Length is treated as "size unknown", not as a crash
+            bad_length = stream_fetcher._make_request(f"{base_url}/bad-length")
+            # The deadline also covers waiting for the headers and any retries
+            start = time.perf_counter()
+            slow_headers = stream_fetcher._make_request(f"{base_url}/slow?delay=1.5", deadline=0.3)
+            slow_headers_time = time.perf_counter() - start
+
+        print("\n--- Local API Test Assertions ---")
+        assert joke_result != "Failed to retrieve joke.", "TEST FAILED: Joke retrieval was unsuccessful."
+        assert quote_result != "Failed to retrieve quote.", "TEST FAILED: Quote retrieval was unsuccessful."
+        assert flaky_result == {"value": "Succeeded on call 3"}, "TEST FAILED: Retry policy did not recover."
+        assert rate_limited_time >= 0.4, "TEST FAILED: Rate limiter let requests through too fast."
+        assert first_cached == revalidated == from_memory == {"value": "Cache me if you can."}, \
+            "TEST FAILED: Cached data did not match the original response."
+        assert bodies_sent == 1, "TEST FAILED: Conditional requests still downloaded the full body."
+        assert batch_results == async_results, "TEST FAILED: Thread and asyncio batch results differ."
+        assert batch_results[1] is None and batch_results[0] == batch_results[2] is not None, \
+            "TEST FAILED: Batch results were not isolated per URL."
+        assert batch_time < 0.4, "TEST FAILED: Batch requests did not run concurrently."
+        assert prefetch_time < 0.05, "TEST FAILED: Prefetched items were not served from memory."
+        assert stale_joke == prefetched_jokes[-1] and prefetch_stats["fallback"] == 1, \
+            "TEST FAILED: An empty prefetch buffer did not fall back to the last item."
+        assert ndjson_count == 20000 and array_ids == list(range(20000)), \
+            "TEST FAILED: Streamed records were lost or reordered."
+        assert too_big is None and deadline_enforced, "TEST FAILED: Payload limits were not enforced."
+        assert [record["value"] for record in text_records] == ["récord 0", "récord 1", "récord 2"], \
+            "TEST FAILED: A text/plain JSON stream was not decoded as UTF-8."
+        assert bad_length == {"value": "Content-Length is not a number"}, \
+            "TEST FAILED: A malformed Content-Length header broke the request."
+        assert slow_headers is None and slow_headers_time < 0.6, \
+            "TEST FAILED: The deadline did not cover the wait for the response headers."
+        print(f"✅ Assertions passed: retries recovered from 503s; 10 rate-limited calls took {rate_limited_time:.2f}s; "
+              f"3 cached lookups downloaded the body {bodies_sent} time.")
+    finally:
+        server.shutdown()
+
+
+def run_fetch_benchmark(count: int = 20, delay: float = 0.2, max_concurrency: int = 10):
+    """
+    Fetches `count` distinct slow URLs (each takes `delay` seconds) from the local
+    stand-in server: one by one, with fetch_many, and with fetch_many_async.
+    """
+    server, base_url = start_local_api_server()
+    urls = [f"{base_url}/slow?delay={delay}&item={i}" for i in range(count)]
+    timings = {}
+    try:
+        with APIFetcher(name="Benchmark Bot", pool_size=max_concurrency) as fetcher:
+            start = time.perf_counter()
+            sequential = [fetcher._make_request(url) for url in urls]
+            timings["sequential"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            threaded = fetcher.fetch_many(urls, max_concurrency=max_concurrency)
+            timings["fetch_many (threads)"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with_asyncio = asyncio.run(fetcher.fetch_many_async(urls, max_concurrency=max_concurrency))
+            timings["fetch_many_async"] = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert sequential == threaded == with_asyncio, "Benchmark results differ between methods."
+    print(f"\n--- Batch Fetch Benchmark: {count} URLs, {delay}s each, concurrency {max_concurrency} ---")
+    for label, seconds in timings.items():
+        speedup = timings["sequential"] / seconds
+        print(f"{label:<22} {seconds:6.2f}s   ({speedup:4.1f}x)")
+    return timings
+
+
 if __name__ == "__main__":
-    run_api_demo()
+    # python Data_fetcher.py --local      runs the demo against the built-in stand-in server
+    # python Data_fetcher.py --benchmark  compares sequential and batch fetching locally
+    if "--benchmark" in sys.argv:
+        run_fetch_benchmark()
+    elif "--local" in sys.argv:
+        run_local_demo()
+    else:
+        run_api_demo()
@@ -1,21 +1,823 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
 
 # 1. Define the URL (the web address) you want to scrape
 URL = "http://books.toscrape.com/"
 
-# 2. Use the 'requests' library to download the webpage content
-page = requests.get(URL)
 
-# 3. Use 'BeautifulSoup' to parse (read) the downloaded content
-soup = BeautifulSoup(page.content, "html.parser")
+def scrape_title(url=URL, cache=None, offline=False):
+    """
+    The original one-page scraper: download a page and print its main heading.
+    With a PageCache (see section 8) the page is revalidated or, offline, read from disk.
+    """
+    # 2. Use the 'requests' library to download the webpage content
+    if cache:
+        content = fetch_page(requests.Session(), url, cache=cache, offline=offline)["body"]
+    else:
+        content = requests.get(url).content
 
-# 4. Find the first <h1> tag, which usually contains the main title
-#    (This is the "scraping" part!)
-main_heading = soup.find("h1")
+    # 3. Use 'BeautifulSoup' to parse (read) the downloaded content
+    soup = BeautifulSoup(content, "html.parser")
 
-# 5. Print the text contained within that tag
-print(f"Webpage Title Found: {main_heading.text}")
+    # 4. Find the first <h1> tag, which usually contains the main title
+    #    (This is the "scraping" part!)
+    main_heading = soup.find("h1")
 
-print("\n--- Scraping Complete ---")
+    # 5. Print the text contained within that tag
+    print(f"Webpage Title Found: {main_heading.text}")
 
+    print("\n--- Scraping Complete ---")
+    return main_heading.text
+
+
+# --- 6. URL Normalization ---
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url, base=None):
+    """
+    Turns a link into one canonical form, so the same page is never crawled twice
+    just because it was written differently:
+      - relative links are resolved against `base` ("../page-2.html")
+      - scheme and host are lower-cased, default ports (:80, :443) dropped
+      - "." and ".." path segments are resolved, an empty path becomes "/"
+      - the #fragment is removed (it's the same page) and query parameters are sorted
+    Returns None for links we can't crawl (mailto:, javascript:, ...).
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+
+    # urljoin resolves dot segments for us when given an absolute base
+    path = urlsplit(urljoin(f"{scheme}://{host}/", parts.path or "/")).path
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# --- 7. Per-Domain Politeness ---
+class PolitenessPolicy:
+    """
+    Makes sure requests to the same domain are at least `delay` seconds apart,
+    however many worker threads are crawling. Different domains don't wait for
+    each other.
+    """
+
+    def __init__(self, delay=0.5):
+        self.delay = delay
+        self._next_slot = {}  # host -> earliest time the next request may start
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """Blocks until it is this thread's turn to contact `host`."""
+        if self.delay <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_slot.get(host, now))
+            # Reserve the slot now, so the next thread queues up behind us
+            self._next_slot[host] = start_at + self.delay
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+# --- 8. On-Disk Page Cache ---
+class PageNotCached(LookupError):
+    """Raised in offline mode when a page was never downloaded into the cache."""
+
+
+class PageCache:
+    """
+    Keeps downloaded pages on disk so re-runs don't hit the network:
+
+        <directory>/pages/<sha256 of url>.json      -> url, status, headers, validators, body hash
+        <directory>/bodies/<ab>/<sha256 of body>.gz -> the page itself, gzip-compressed
+
+    Bodies are stored by the hash of their CONTENT, so identical pages are only
+    stored once. ETag / Last-Modified are kept for conditional revalidation
+    (an unchanged page costs a 304 reply instead of a full download).
+    Files are written to a temp name first and then renamed, so a crash never
+    leaves a half-written entry behind.
+    """
+
+    KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+    def __init__(self, directory, compress_level=6):
+        self.directory = directory
+        self.compress_level = compress_level
+        self.stats = {"hit": 0, "revalidated": 0, "downloaded": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+
+    def _entry_path(self, url):
+        return os.path.join(self.directory, "pages", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash + ".gz")
+
+    @staticmethod
+    def _write_atomically(path, data):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, url):
+        """Returns the stored entry (a dict) for url, or None."""
+        try:
+            with open(self._entry_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def read_body(self, entry):
+        with open(self._body_path(entry["body_sha256"]), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def store(self, url, final_url, status, headers, body):
+        """Saves a downloaded page. Returns the new entry."""
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):  # Same content already stored? Nothing to write.
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            self._write_atomically(body_path, gzip.compress(body, self.compress_level))
+        entry = {
+            "url": url,
+            "final_url": final_url,
+            "status": status,
+            "headers": {name: headers[name] for name in self.KEPT_HEADERS if name in headers},
+            "body_sha256": body_hash,
+            "fetched_at": time.time(),
+        }
+        self._write_atomically(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+        return entry
+
+    def touch(self, url, entry):
+        """The server said 304 Not Modified: mark the entry as freshly checked."""
+        entry["fetched_at"] = time.time()
+        self._write_atomically(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def entries(self):
+        """Yields every stored entry (for offline re-processing)."""
+        pages_dir = os.path.join(self.directory, "pages")
+        for entry in os.scandir(pages_dir):
+            if entry.name.endswith(".json"):
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    yield json.load(f)
+
+
+def fetch_page(session, url, timeout=10, cache=None, offline=False, max_age=0, politeness=None):
+    """
+    Downloads one page, going through `cache` when given:
+      - offline=True: only the cache is used (PageNotCached if the page isn't there)
+      - a cached copy younger than max_age seconds is used without asking the server
+      - an older copy is revalidated with If-None-Match / If-Modified-Since
+    politeness.wait(host) is only called when we really go to the network.
+    Returns {"url", "final_url", "status", "content_type", "body", "source"}.
+    """
+    entry = cache.get(url) if cache else None
+
+    def from_entry(source):
+        return {"url": url, "final_url": entry["final_url"], "status": entry["status"],
+                "content_type": entry["headers"].get("Content-Type", ""),
+                "body": cache.read_body(entry), "source": source}
+
+    if offline:
+        if entry is None:
+            raise PageNotCached(f"{url} is not in the page cache")
+        cache.count("hit")
+        return from_entry("cache")
+    if entry and time.time() - entry["fetched_at"] < max_age:
+        cache.count("hit")
+        return from_entry("cache")
+
+    headers = {}
+    if entry:
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+    if politeness:
+        politeness.wait(urlsplit(url).netloc)
+    response = session.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and entry:
+        cache.touch(url, entry)
+        cache.count("revalidated")
+        return from_entry("revalidated")
+
+    if cache and response.ok:
+        cache.store(url, response.url, response.status_code, response.headers, response.content)
+        cache.count("downloaded")
+    return {"url": url, "final_url": response.url, "status": response.status_code,
+            "content_type": response.headers.get("Content-Type", ""),
+            "body": response.content, "source": "network"}
+
+
+def _extract_cached_chunk(directory, fields, entries):
+    """Process-pool worker: runs one Extractor over a chunk of cached pages."""
+    cache = PageCache(directory)
+    extractor = Extractor(fields)
+    return {entry["url"]: extractor.extract(cache.read_body(entry),
+                                            declared_charset(entry["headers"].get("Content-Type")))
+            for entry in entries}
+
+
+def replay_extraction(cache, fields, workers=None, chunk_size=200):
+    """
+    Re-runs extraction over EVERY cached page without touching the network,
+    spread over all CPU cores. Returns {url: extracted fields}.
+    Handy for iterating on selectors: change `fields`, replay, compare.
+    """
+    entries = [entry for entry in cache.entries() if 200 <= entry["status"] < 300]
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_extract_cached_chunk, cache.directory, fields, chunk) for chunk in chunks]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+# --- 9. Targeted Extraction ---
+# Selectors are tiny strings:  tag[.class][#id][@attribute][*]
+#   "h1"               -> text of the first <h1>
+#   "p.price_color"    -> text of the first <p class="price_color">
+#   "a@href*"          -> the href of EVERY <a> ("*" means "all matches", as a list)
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "source", "track", "wbr"}
+
+
+def declared_charset(content_type):
+    """The charset=... of a Content-Type header, or None if it doesn't name one."""
+    for part in (content_type or "").split(";")[1:]:
+        key, _, value = part.partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip('"') or None
+    return None
+
+
+def decode_html(html, encoding=None):
+    """
+    Bytes -> text, choosing the encoding the way BeautifulSoup does: the HTTP charset
+    (`encoding`), a byte-order mark, the page's <meta charset>, then UTF-8 / Windows-1252.
+    """
+    if not isinstance(html, bytes):
+        return html
+    return UnicodeDammit(html, known_definite_encodings=[encoding] if encoding else [],
+                         is_html=True).unicode_markup
+
+
+class FieldSelector:
+    """One compiled selector (see the syntax above)."""
+
+    def __init__(self, selector):
+        self.selector = selector
+        self.many = selector.endswith("*")
+        selector = selector.rstrip("*")
+        selector, _, self.attribute = selector.partition("@")
+        self.attribute = self.attribute or None
+        selector, _, self.element_id = selector.partition("#")
+        self.element_id = self.element_id or None
+        self.tag, *classes = selector.split(".")
+        self.tag = self.tag.lower()
+        self.classes = set(classes)
+
+    def matches(self, tag, attrs):
+        """attrs is a dict of the element's attributes."""
+        if tag != self.tag:
+            return False
+        if self.element_id is not None and attrs.get("id") != self.element_id:
+            return False
+        if self.classes and not self.classes.issubset((attrs.get("class") or "").split()):
+            return False
+        return self.attribute is None or attrs.get(self.attribute) is not None
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    Reads the HTML once, start to finish, WITHOUT building a tree: it only keeps
+    the text/attributes of elements that match a selector. It stops early once
+    every single-value field has been found (and no "*" fields are left).
+    Elements close the way they do in BeautifulSoup's full tree: at their own end
+    tag, at the end tag of an element around them (so an unclosed <p> or <li> ends
+    with its parent), or at the end of the page.
+    """
+
+    class _Finished(Exception):
+        pass
+
+    def __init__(self, selectors):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.values = {name: [] if selector.many else None for name, selector in selectors.items()}
+        self._open_tags = []  # Names of the elements open right now (just names, not a tree)
+        self._capturing = []  # [field name, list index or None, open_tags depth, text parts]
+        self._pending = {name for name, selector in selectors.items() if not selector.many}
+        self._can_stop_early = all(not selector.many for selector in selectors.values())
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        for name, selector in self.selectors.items():
+            if (not selector.many and name not in self._pending) or not selector.matches(tag, attributes):
+                continue
+            if not selector.many:
+                self._pending.discard(name)  # The FIRST match wins, even if a nested one closes first
+            if selector.attribute:
+                self._store(name, None, attributes[selector.attribute])
+                self._stop_if_done()
+            elif tag not in VOID_TAGS:
+                index = None
+                if selector.many:
+                    index = len(self.values[name])  # Keep document order, like find_all
+                    self.values[name].append(None)
+                self._capturing.append([name, index, len(self._open_tags), []])
+        if tag not in VOID_TAGS:
+            self._open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        # Close the most recent open element with this name, and everything still open inside it
+        for depth in range(len(self._open_tags) - 1, -1, -1):
+            if self._open_tags[depth] == tag:
+                del self._open_tags[depth:]
+                self._finish_captures(depth)
+                return
+        # An end tag with nothing to close is ignored
+
+    def handle_data(self, data):
+        for capture in self._capturing:
+            capture[3].append(data)
+
+    def _finish_captures(self, depth):
+        """Stores every capture whose element started at or below `depth` (outermost first)."""
+        finished = [capture for capture in self._capturing if capture[2] >= depth]
+        if not finished:
+            return
+        self._capturing = [capture for capture in self._capturing if capture[2] < depth]
+        for name, index, _, parts in finished:
+            # Separate text nodes are joined with a space, like get_text(" ", strip=True)
+            self._store(name, index, " ".join(" ".join(parts).split()))
+        self._stop_if_done()
+
+    def _store(self, name, index, value):
+        if self.selectors[name].many:
+            if index is None:
+                self.values[name].append(value)
+            else:
+                self.values[name][index] = value
+            return
+        self.values[name] = value
+
+    def _stop_if_done(self):
+        if self._can_stop_early and not self._pending and not self._capturing:
+            raise self._Finished()
+
+    def run(self, html):
+        try:
+            self.feed(html)
+            self.close()
+            self._finish_captures(0)  # The end of the page closes whatever is still open
+        except self._Finished:
+            pass
+        return self.values
+
+
+class _StrainedSoup(BeautifulSoup):
+    """
+    With a SoupStrainer, BeautifulSoup never builds the skipped elements, so it can't
+    tell when a kept element's parent closes: an unclosed <p> inside a <div> would run
+    on to the end of the page. This remembers the skipped open tags, so their end tags
+    still close what's inside them, as in the full tree.
+    """
+
+    def reset(self):
+        super().reset()
+        self._skipped_open = []
+
+    def handle_starttag(self, name, *args, **kwargs):
+        outside = len(self.tagStack) <= 1  # No kept element is open
+        tag = super().handle_starttag(name, *args, **kwargs)
+        if tag is None and outside and name not in VOID_TAGS:
+            self._skipped_open.append(name)
+        return tag
+
+    def handle_endtag(self, name, nsprefix=None):
+        if name in self._skipped_open and all(tag.name != name for tag in self.tagStack[1:]):
+            self.endData()
+            while len(self.tagStack) > 1:
+                self.popTag()
+            last = len(self._skipped_open) - 1 - self._skipped_open[::-1].index(name)
+            del self._skipped_open[last:]
+            return
+        super().handle_endtag(name, nsprefix)
+
+
+class Extractor:
+    """
+    Declarative field extraction, compiled once and reused for every page:
+
+        BOOK_FIELDS = Extractor({"title": "h1", "price": "p.price_color", "links": "a@href*"})
+        BOOK_FIELDS.extract(html)  # -> {"title": ..., "price": ..., "links": [...]}
+
+    backend="stream"   : StreamingExtractor, no tree at all (fastest, least memory)
+    backend="strainer" : BeautifulSoup with a SoupStrainer, so only the tags the
+                         selectors need are built into the tree
+    """
+
+    BACKENDS = ("stream", "strainer")
+
+    def __init__(self, fields, backend="stream"):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', choose from {self.BACKENDS}")
+        self.backend = backend
+        self.selectors = {name: FieldSelector(selector) for name, selector in fields.items()}
+        self.strainer = SoupStrainer(sorted({selector.tag for selector in self.selectors.values()}))
+
+    def extract(self, html, encoding=None):
+        """html is text or bytes; for bytes, `encoding` is the charset from the HTTP headers (if any)."""
+        html = decode_html(html, encoding)
+        if self.backend == "stream":
+            return StreamingExtractor(self.selectors).run(html)
+
+        soup = _StrainedSoup(html, "html.parser", parse_only=self.strainer)
+        values = {}
+        for name, selector in self.selectors.items():
+            found = [element for element in soup.find_all(selector.tag)
+                     if selector.matches(selector.tag, {key: " ".join(value) if isinstance(value, list) else value
+                                                        for key, value in element.attrs.items()})]
+            if selector.attribute:
+                found = [element[selector.attribute] for element in found]
+            else:
+                found = [element.get_text(" ", strip=True) for element in found]
+                found = [" ".join(text.split()) for text in found]
+            values[name] = found if selector.many else (found[0] if found else None)
+        return values
+
+
+# What the crawler needs from every page
+PAGE_EXTRACTOR = Extractor({"title": "h1", "links": "a@href*"})
+
+
+# --- 10. The Crawler ---
+class Crawler:
+    """
+    A multi-threaded crawler:
+      - a frontier queue of (url, depth) still to visit
+      - a "seen" set, so every normalized URL is queued only once
+      - a fixed pool of worker threads sharing ONE requests Session
+        (keep-alive connections are reused instead of reconnecting per page)
+      - per-domain politeness delays
+      - link following (which also covers "next page" pagination links)
+
+    Pages are read with an Extractor (default PAGE_EXTRACTOR), which must have a
+    "links" field; every other field is stored in the page record.
+    on_page(url, fields) is called for every HTML page with the extracted fields.
+
+    With a PageCache, pages are revalidated instead of re-downloaded; with
+    offline=True the crawl runs entirely from the cache.
+    """
+
+    def __init__(self, start_urls, max_pages=1000, max_depth=None, workers=8, delay=0.5,
+                 same_domain=True, timeout=10, session=None, on_page=None, verbose=True,
+                 extractor=PAGE_EXTRACTOR, cache=None, offline=False, max_age=0):
+        if isinstance(start_urls, str):
+            start_urls = [start_urls]
+        self.start_urls = [normalize_url(url) for url in start_urls]
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.workers = workers
+        self.timeout = timeout
+        self.on_page = on_page
+        self.extractor = extractor
+        # Optional PageCache; offline=True replays a previous crawl purely from it
+        self.cache = cache
+        self.offline = offline
+        self.max_age = max_age
+        self.verbose = verbose
+        self.politeness = PolitenessPolicy(delay)
+        # Only follow links to the domains we started on (unless same_domain=False)
+        self.allowed_hosts = {urlsplit(url).netloc for url in self.start_urls} if same_domain else None
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.frontier = queue.Queue()
+        self.seen = set()
+        self.results = {}  # url -> page record
+        self._lock = threading.Lock()
+
+    def _enqueue(self, url, depth):
+        """Adds a URL to the frontier unless it was seen before or a limit is reached."""
+        if url is None:
+            return
+        if self.allowed_hosts is not None and urlsplit(url).netloc not in self.allowed_hosts:
+            return
+        if self.max_depth is not None and depth > self.max_depth:
+            return
+        with self._lock:
+            if url in self.seen or len(self.seen) >= self.max_pages:
+                return
+            self.seen.add(url)
+        self.frontier.put((url, depth))
+
+    def _fetch_page(self, url, depth):
+        """Downloads (or loads from the cache) one page, records it and queues its links."""
+        start = time.perf_counter()
+        page = fetch_page(self.session, url, timeout=self.timeout, cache=self.cache,
+                          offline=self.offline, max_age=self.max_age, politeness=self.politeness)
+        record = {"url": url, "status": page["status"], "depth": depth,
+                  "title": None, "links": 0, "seconds": 0.0, "source": page["source"]}
+
+        if 200 <= page["status"] < 300 and "html" in page["content_type"]:
+            fields = self.extractor.extract(page["body"], declared_charset(page["content_type"]))
+            links = fields.pop("links")
+            record.update(fields)
+            record["links"] = len(links)
+            # Links are resolved against the final URL, in case we were redirected
+            for link in links:
+                self._enqueue(normalize_url(link, base=page["final_url"]), depth + 1)
+            if self.on_page:
+                self.on_page(url, fields)
+
+        record["seconds"] = time.perf_counter() - start
+        return record
+
+    def _worker(self):
+        while True:
+            item = self.frontier.get()
+            if item is None:  # Sentinel: the crawl is over
+                self.frontier.task_done()
+                return
+            url, depth = item
+            try:
+                record = self._fetch_page(url, depth)
+            except Exception as err:
+                # One bad page (network error, broken HTML, failing on_page) must not stop the crawl
+                record = {"url": url, "status": None, "depth": depth, "error": str(err)}
+            with self._lock:
+                self.results[url] = record
+            if self.verbose:
+                print(f"[{len(self.results):>5}] {record['status']} {url}")
+            self.frontier.task_done()
+
+    def crawl(self):
+        """Runs the crawl until the frontier is empty. Returns {url: page record}."""
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for url in self.start_urls:
+            self._enqueue(url, 0)
+
+        # join() returns once every queued page has been processed (including the
+        # pages found while processing), then one sentinel per worker stops them
+        self.frontier.join()
+        for _ in threads:
+            self.frontier.put(None)
+        for thread in threads:
+            thread.join()
+        return self.results
+
+
+# --- 11. Local Fixture Site (for testing without the internet) ---
+def build_fixture_site(directory, books=1000, per_page=20):
+    """
+    Writes a small static "bookshop" shaped like books.toscrape.com:
+    index.html -> catalogue/page-N.html (paginated, with "next" links)
+    -> catalogue/book_N/index.html (each links back to the catalogue).
+    Some links are deliberately messy (fragments, "./", "..", absolute paths)
+    to exercise URL normalization. Returns the number of pages written.
+    """
+    catalogue = os.path.join(directory, "catalogue")
+    os.makedirs(catalogue, exist_ok=True)
+    page_count = (books + per_page - 1) // per_page
+
+    def write(path, title, links):
+        anchors = "\n".join(f'<a href="{href}">{text}</a>' for href, text in links)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<html><head><title>{title}</title></head>"
+                    f"<body><h1>{title}</h1>\n{anchors}\n</body></html>")
+
+    write(os.path.join(directory, "index.html"), "All products",
+          [("catalogue/page-1.html", "Books"), ("mailto:shop@example.com", "Contact")])
+    for page in range(1, page_count + 1):
+        first = (page - 1) * per_page
+        links = [(f"book_{i}/index.html", f"Book {i}") for i in range(first, min(first + per_page, books))]
+        links.append(("../#top", "Home"))
+        if page < page_count:
+            links.append((f"./page-{page + 1}.html", "next"))
+        write(os.path.join(catalogue, f"page-{page}.html"), f"Catalogue page {page}", links)
+    for i in range(books):
+        os.makedirs(os.path.join(catalogue, f"book_{i}"), exist_ok=True)
+        page = i // per_page + 1
+        write(os.path.join(catalogue, f"book_{i}", "index.html"), f"Book {i}",
+              [(f"../page-{page}.html", "Back"), ("/catalogue/page-1.html", "First page")])
+    return 1 + page_count + books
+
+
+class QuietFileHandler(SimpleHTTPRequestHandler):
+    """Serves files from the fixture directory without logging every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(directory):
+    """Serves `directory` on a free local port. Returns (server, base_url)."""
+    handler = lambda *args, **kwargs: QuietFileHandler(*args, directory=directory, **kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def run_local_demo(books=1000, workers=16):
+    """Crawls a generated fixture site from a local http.server and checks the results."""
+    with tempfile.TemporaryDirectory() as directory:
+        expected_pages = build_fixture_site(directory, books=books)
+        server, base_url = start_fixture_server(directory)
+        try:
+            start = time.perf_counter()
+            results = Crawler(base_url, max_pages=expected_pages + 100, workers=workers,
+                              delay=0, verbose=False).crawl()
+            elapsed = time.perf_counter() - start
+
+            # The page limit is respected, and a crawl spreads its requests out per domain
+            limited = Crawler(base_url, max_pages=10, workers=4, delay=0, verbose=False).crawl()
+            start = time.perf_counter()
+            Crawler(base_url, max_pages=5, workers=4, delay=0.1, verbose=False).crawl()
+            polite_time = time.perf_counter() - start
+
+            # Page cache: the first crawl downloads, the second only revalidates (304s)
+            cache = PageCache(os.path.join(directory, ".page_cache"))
+            Crawler(base_url, max_pages=200, workers=workers, delay=0, verbose=False, cache=cache).crawl()
+            downloaded = cache.stats["downloaded"]
+            Crawler(base_url, max_pages=200, workers=workers, delay=0, verbose=False, cache=cache).crawl()
+            revalidated = cache.stats["revalidated"]
+        finally:
+            server.shutdown()
+
+        # The server is gone: offline replay must still find every cached page
+        start = time.perf_counter()
+        offline = Crawler(base_url, max_pages=200, workers=workers, delay=0, verbose=False,
+                          cache=cache, offline=True).crawl()
+        offline_time = time.perf_counter() - start
+        replayed = replay_extraction(cache, {"title": "h1"})
+
+    # Both backends must agree with the full tree on sloppy markup and on non-UTF-8 pages
+    sloppy = '<div><p class="price_color">£10<p>next</div><ul><li>one<li>two</ul><h1>Title'
+    sloppy_fields = {"title": "h1", "price": "p.price_color", "items": "li*"}
+    sloppy_results = [Extractor(sloppy_fields, backend=backend).extract(sloppy) for backend in ("stream", "strainer")]
+    latin1_page = '<meta charset="iso-8859-1"><h1>Café</h1>'.encode("latin-1")
+    latin1_titles = [Extractor({"title": "h1"}, backend=backend).extract(page, encoding)["title"]
+                     for backend in ("stream", "strainer")
+                     for page, encoding in ((latin1_page, None), ("<h1>Café</h1>".encode("cp1252"), "cp1252"))]
+
+    print("\n--- Local Crawler Test Assertions ---")
+    assert len(results) == expected_pages, f"TEST FAILED: Crawled {len(results)} of {expected_pages} pages."
+    assert all(record["status"] == 200 for record in results.values()), "TEST FAILED: Some pages failed."
+    assert results[normalize_url(base_url + "catalogue/book_7/index.html")]["title"] == "Book 7", \
+        "TEST FAILED: Page titles were not extracted."
+    assert len(limited) == 10, "TEST FAILED: max_pages was not respected."
+    assert polite_time >= 0.4, "TEST FAILED: Politeness delay was not applied."
+    assert downloaded == 200 and revalidated == 200, "TEST FAILED: Cached pages were not revalidated."
+    assert len(offline) == 200 and all(record["source"] == "cache" for record in offline.values()), \
+        "TEST FAILED: Offline replay did not run from the cache."
+    assert replayed[normalize_url(base_url + "catalogue/page-1.html")]["title"] == "Catalogue page 1", \
+        "TEST FAILED: Extraction replay over the cache failed."
+    assert sloppy_results == [{"title": "Title", "price": "£10 next", "items": ["one two", "two"]}] * 2, \
+        f"TEST FAILED: Unclosed tags were not closed like the full tree does: {sloppy_results}"
+    assert latin1_titles == ["Café"] * 4, f"TEST FAILED: The declared charset was ignored: {latin1_titles}"
+    print(f"✅ Assertions passed: {len(results)} pages crawled once each in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.0f} pages/s with {workers} workers); "
+          f"offline replay of {len(offline)} cached pages took {offline_time:.2f}s.")
+
+
+# --- 12. Extraction Benchmark ---
+BOOK_FIELDS = {"title": "h1", "price": "p.price_color", "availability": "p.instock", "links": "a@href*"}
+
+
+def render_product_page(i, sidebar_links=50, paragraphs=20):
+    """A product page about as heavy as a real books.toscrape.com page (navigation, sidebar, table, text)."""
+    sidebar = "\n".join(f'<li><a href="../category/books/genre_{n}/index.html">Genre {n}</a></li>'
+                        for n in range(sidebar_links))
+    rows = "\n".join(f"<tr><th>Property {n}</th><td>Value {n * i}</td></tr>" for n in range(10))
+    text = "\n".join(f"<p>Paragraph {n} about <b>book {i}</b>, with <i>some</i> inline markup.</p>"
+                     for n in range(paragraphs))
+    return (f'<html><head><title>Book {i}</title><meta charset="utf-8"></head><body>'
+            f'<div class="container"><ul class="breadcrumb"><li><a href="../index.html">Home</a></li></ul>'
+            f'<aside><ul class="nav">{sidebar}</ul></aside>'
+            f'<article class="product_page"><div class="col-sm-6 product_main">'
+            f'<h1>Book {i}</h1><p class="price_color">£{10 + i % 40}.99</p>'
+            f'<p class="instock availability"> In stock ({i % 20} available) </p></div>'
+            f'<table class="table table-striped">{rows}</table>{text}</article></div></body></html>')
+
+
+def extract_with_full_tree(html):
+    """The original approach: build the complete tree, then search it."""
+    soup = BeautifulSoup(html, "html.parser")
+    return {
+        "title": soup.find("h1").get_text(" ", strip=True),
+        "price": soup.find("p", class_="price_color").get_text(" ", strip=True),
+        "availability": " ".join(soup.find("p", class_="instock").get_text(" ", strip=True).split()),
+        "links": [a["href"] for a in soup.find_all("a", href=True)],
+    }
+
+
+def run_extraction_benchmark(pages=200):
+    """Compares parse time and peak memory per page: full tree vs SoupStrainer vs streaming parser."""
+    html_pages = [render_product_page(i) for i in range(pages)]
+    approaches = {
+        "full tree (BeautifulSoup)": extract_with_full_tree,
+        "SoupStrainer": Extractor(BOOK_FIELDS, backend="strainer").extract,
+        "streaming HTMLParser": Extractor(BOOK_FIELDS, backend="stream").extract,
+        "streaming, title only": Extractor({"title": "h1"}).extract,
+    }
+    expected = [extract_with_full_tree(html) for html in html_pages]
+
+    print(f"\n--- Extraction Benchmark: {pages} pages, ~{len(html_pages[0]) // 1024} KB each ---")
+    print(f"{'approach':<28} {'ms/page':>8} {'peak KB/page':>13}")
+    for label, extract in approaches.items():
+        start = time.perf_counter()
+        results = [extract(html) for html in html_pages]
+        per_page_ms = (time.perf_counter() - start) * 1000 / pages
+
+        # Peak memory while extracting ONE page (tracemalloc slows things down, so it's measured separately)
+        tracemalloc.start()
+        extract(html_pages[0])
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+        if "title only" not in label:
+            assert results == expected, f"{label} extracted different values."
+        print(f"{label:<28} {per_page_ms:8.2f} {peak_kb:13.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scrape a page title, or crawl a whole site.",
+        epilog="Example: python code_debug.py --crawl --max-pages 200 --delay 0.5"
+    )
+    parser.add_argument("url", nargs="?", default=URL, help=f"Page or site to scrape (default: {URL})")
+    parser.add_argument("--crawl", action="store_true", help="Follow links and crawl the whole site")
+    parser.add_argument("--max-pages", type=int, default=1000, help="Stop after this many pages (default: 1000)")
+    parser.add_argument("--depth", type=int, help="Maximum link depth from the start page (default: no limit)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of crawler threads (default: 8)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="Seconds between requests to the same domain (default: 0.5)")
+    parser.add_argument("--cache", help="Keep downloaded pages in this directory and revalidate them on re-runs")
+    parser.add_argument("--offline", action="store_true", help="Use only pages already in --cache (no network)")
+    parser.add_argument("--max-age", type=float, default=0,
+                        help="Use cached pages younger than this many seconds without revalidating (default: 0)")
+    parser.add_argument("--local", action="store_true",
+                        help="Crawl a generated fixture site on a local server and check the results")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare full-tree parsing with the targeted extractors")
+    args = parser.parse_args()
+    if args.offline and not args.cache:
+        parser.error("--offline needs a --cache directory")
+    page_cache = PageCache(args.cache) if args.cache else None
+
+    if args.benchmark:
+        run_extraction_benchmark()
+    elif args.local:
+        run_local_demo()
+    elif args.crawl:
+        start = time.perf_counter()
+        pages = Crawler(args.url, max_pages=args.max_pages, max_depth=args.depth,
+                        workers=args.workers, delay=args.delay, cache=page_cache,
+                        offline=args.offline, max_age=args.max_age).crawl()
+        failed = sum(1 for record in pages.values() if record.get("status") != 200)
+        print(f"\n--- Crawl Complete: {len(pages)} pages ({failed} failed) "
+              f"in {time.perf_counter() - start:.2f}s ---")
+        if page_cache:
+            print(f"Page cache: {page_cache.stats}")
+    else:
+        scrape_title(args.url, cache=page_cache, offline=args.offline)
@@ -2,16 +2,198 @@ import multiprocessing
 import time
 import hashlib # Crucial library for cryptographic hashing
 import os # Used to generate a secure random salt
+import sys
+import argparse
+import hmac # Constant-time comparison and keyed digests
+import threading
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# --- 1. The CPU-Bound Task Function ---
-def hash_password(task_id, password):
+# Number of key-stretching rounds used for every password
+HASH_ITERATIONS = 500000
+
+# --- 1. Key Derivation Function (KDF) Backends ---
+# A KDF turns (password, salt) into a hash that is deliberately slow to compute.
+# Each backend has ONE "cost" knob (iterations, or scrypt's n) that controls how slow.
+# The original code ran its 500,000 rounds as a Python loop, which builds a new bytes
+# object and a new hash object every round. pbkdf2_hmac and scrypt do their rounds in C.
+
+class KDFBackend:
+    """Parent class for all KDF backends."""
+    name = "base"
+
+    def __init__(self, cost):
+        self.cost = cost
+
+    def derive(self, password_bytes, salt):
+        """Returns the raw derived hash bytes. Children must override this."""
+        raise NotImplementedError
+
+    def params(self):
+        """The settings needed to recompute a hash later (stored next to it)."""
+        return {"cost": self.cost}
+
+    def with_cost(self, cost):
+        """Returns a copy of this backend with a different cost (used by calibration)."""
+        params = self.params()
+        params["cost"] = cost
+        return type(self)(**params)
+
+    @staticmethod
+    def round_cost(cost):
+        """Tidies up a cost estimated by calibration."""
+        return max(1, int(cost))
+
+    def __repr__(self):
+        settings = ", ".join(f"{key}={value}" for key, value in self.params().items())
+        return f"{type(self).__name__}({settings})"
+
+
+class LegacySHA256Backend(KDFBackend):
+    """
+    Compatibility backend: the original Python loop of sha256(salt + previous_hash).
+    Only kept so hashes made by earlier versions can still be verified.
+    """
+    name = "legacy-sha256"
+
+    def __init__(self, cost=HASH_ITERATIONS):
+        super().__init__(cost)
+
+    def derive(self, password_bytes, salt):
+        # Looking the function up once (outside the loop) saves a little time per round
+        sha256 = hashlib.sha256
+        hashed_result = password_bytes
+        for _ in range(self.cost):
+            hashed_result = sha256(salt + hashed_result).digest()
+        return hashed_result
+
+
+class PBKDF2Backend(KDFBackend):
+    """PBKDF2-HMAC (the standard iterated-hash KDF), computed in C by hashlib."""
+    name = "pbkdf2-sha256"
+
+    def __init__(self, cost=HASH_ITERATIONS, hash_name="sha256"):
+        super().__init__(cost)
+        self.hash_name = hash_name
+
+    def derive(self, password_bytes, salt):
+        return hashlib.pbkdf2_hmac(self.hash_name, password_bytes, salt, self.cost)
+
+    def params(self):
+        return {"cost": self.cost, "hash_name": self.hash_name}
+
+
+class ScryptBackend(KDFBackend):
+    """
+    scrypt: memory-hard, so attackers can't just throw GPUs at it.
+    The cost is scrypt's n (must be a power of 2); memory used is about 128 * r * n bytes.
+    """
+    name = "scrypt"
+
+    def __init__(self, cost=2 ** 14, r=8, p=1):
+        if cost < 2 or cost & (cost - 1):
+            raise ValueError(f"scrypt cost must be a power of 2 greater than 1, got {cost}")
+        super().__init__(cost)
+        self.r = r
+        self.p = p
+
+    def derive(self, password_bytes, salt):
+        # Allow a little more memory than scrypt strictly needs
+        maxmem = 128 * self.r * (self.cost + self.p + 2) + 1024 * 1024
+        return hashlib.scrypt(password_bytes, salt=salt, n=self.cost, r=self.r, p=self.p,
+                              maxmem=maxmem, dklen=32)
+
+    def params(self):
+        return {"cost": self.cost, "r": self.r, "p": self.p}
+
+    @staticmethod
+    def round_cost(cost):
+        # Round DOWN to a power of 2 (never below 2)
+        return max(2, 1 << (max(2, int(cost)).bit_length() - 1))
+
+
+# Registry of backends by name (used by get_kdf and when reading stored hashes)
+KDF_BACKENDS = {
+    LegacySHA256Backend.name: LegacySHA256Backend,
+    PBKDF2Backend.name: PBKDF2Backend,
+    ScryptBackend.name: ScryptBackend,
+}
+
+# Backend used for NEW hashes
+DEFAULT_KDF = PBKDF2Backend()
+
+
+def get_kdf(name, **params):
+    """Creates a backend by name, e.g. get_kdf('scrypt', cost=2**15)."""
+    if name not in KDF_BACKENDS:
+        raise ValueError(f"Unknown KDF '{name}'. Choose from: {', '.join(KDF_BACKENDS)}")
+    return KDF_BACKENDS[name](**params)
+
+
+def calibrate_kdf(name, target_seconds=0.25, **params):
+    """
+    Picks the cost for a backend so that ONE hash takes about `target_seconds`
+    on this machine. Starts cheap and doubles the cost until a hash takes a
+    measurable amount of time, then scales up (time grows linearly with cost).
+    """
+    backend = get_kdf(name, **params)
+    backend = backend.with_cost(backend.round_cost(2 if name == ScryptBackend.name else 1000))
+    salt = os.urandom(16)
+
+    while True:
+        start = time.perf_counter()
+        backend.derive(b"calibration-password", salt)
+        elapsed = time.perf_counter() - start
+        # Stop doubling once a single hash takes at least 1/8 of the target
+        if elapsed >= target_seconds / 8:
+            break
+        backend = backend.with_cost(backend.cost * 2)
+
+    return backend.with_cost(backend.round_cost(backend.cost * target_seconds / elapsed))
+
+
+def encode_password_hash(kdf, salt, hash_hex):
+    """
+    Packs everything needed to verify a password later into ONE string:
+        name$key=value,...$salt_hex$hash_hex
+    e.g. 'pbkdf2-sha256$cost=500000,hash_name=sha256$9f...$3a...'
+    """
+    settings = ",".join(f"{key}={value}" for key, value in kdf.params().items())
+    return f"{kdf.name}${settings}${salt.hex()}${hash_hex}"
+
+
+def parse_password_hash(encoded):
+    """Reverses encode_password_hash: returns (kdf, salt, hash_hex)."""
+    name, settings, salt_hex, hash_hex = encoded.split("$")
+    params = {}
+    for setting in settings.split(","):
+        key, value = setting.split("=", 1)
+        params[key] = int(value) if value.isdigit() else value
+    return get_kdf(name, **params), bytes.fromhex(salt_hex), hash_hex
+
+
+# --- 2. The CPU-Bound Task Functions ---
+def stretch_password(password, salt=None, kdf=None):
+    """
+    The pure hashing step, with no printing: returns a (salt, hash_hex) tuple.
+    A new random salt is generated unless one is passed in.
+    This is the function the worker processes in the pool run.
+    """
+    if salt is None:
+        salt = os.urandom(16)
+    kdf = kdf or DEFAULT_KDF
+    return salt, kdf.derive(password.encode('utf-8'), salt).hex()
+
+
+def hash_password(task_id, password, kdf=None):
     """
     This function simulates a slow, CPU-intensive password hashing operation.
     It repeatedly hashes the password (key stretching) to make it harder to crack,
     which is an ideal scenario for multiprocessing.
     """
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Generate a random salt (a unique random string added to the password before hashing)
     # This prevents attackers from using pre-computed rainbow tables.
@@ -22,24 +204,503 @@ def hash_password(task_id, password):
     
     # 2. Perform the heavy hashing calculation
     
-    # We use a loop of 500,000 iterations to simulate a strong password stretching mechanism.
+    # We use 500,000 PBKDF2 iterations (by default) as a strong password stretching mechanism.
     # This is a CPU-intensive task that benefits massively from multiprocessing.
-    hashed_result = password.encode('utf-8')
-    for _ in range(500000): # Run 500,000 times
-        hashed_result = hashlib.sha256(salt + hashed_result).digest()
+    # The result is already converted to a readable (hex) format.
+    salt, final_hash = stretch_password(password, salt, kdf)
         
-    duration = time.time() - start_time
-    
-    # Convert the final hash to a readable format
-    final_hash = hashed_result.hex() 
+    duration = time.perf_counter() - start_time
     
     # 3. Log the completion of the task
     print(f"✅ [DONE] Task {task_id} finished in {duration:.2f}s.")
     # In a real app, we would store this final_hash and the salt in the database!
     print(f"   [RESULT] Final Hash (first 20 chars): {final_hash[:20]}...") 
+    return salt, final_hash
+
+
+def verify_password(password, salt, expected_hash_hex, kdf=None):
+    """
+    Re-hashes the password with the SAME salt and KDF settings and checks it
+    against the stored hash. Returns True or False.
+    """
+    _, candidate_hash = stretch_password(password, salt, kdf)
+    # hmac.compare_digest takes the same time however many characters match,
+    # so an attacker can't learn the hash one character at a time by timing us
+    return hmac.compare_digest(candidate_hash, expected_hash_hex)
+
+
+def verify_encoded_password(password, encoded):
+    """Verifies a password against a string made by encode_password_hash."""
+    kdf, salt, expected_hash_hex = parse_password_hash(encoded)
+    return verify_password(password, salt, expected_hash_hex, kdf)
+
+
+def verify_chunk(items, kdf=None):
+    """
+    Worker-side batch: verifies a list of (password, salt, hash_hex) in ONE task,
+    so a batch costs one message per worker instead of one per password.
+    """
+    return [verify_password(password, salt, hash_hex, kdf) for password, salt, hash_hex in items]
+
+
+# --- 3. Pool Instrumentation (Timing, Throughput, Utilization) ---
+# Upper edges (in milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf')]
+
+# Set inside each worker process by init_worker_metrics (None = not instrumented)
+_worker_metrics_queue = None
+
+
+def init_worker_metrics(metrics_queue):
+    """Pool initializer: gives every worker process the queue it reports timings on."""
+    global _worker_metrics_queue
+    _worker_metrics_queue = metrics_queue
+
+
+def run_timed(func, submitted_at, *args):
+    """
+    Runs func(*args) inside a worker and sends its timings back to the parent:
+    (worker pid, seconds spent waiting in the queue, seconds spent running).
+    time.perf_counter is a high-resolution clock, unlike time.time.
+    """
+    started_at = time.perf_counter()
+    result = func(*args)
+    run_seconds = time.perf_counter() - started_at
+    if _worker_metrics_queue is not None:
+        _worker_metrics_queue.put((os.getpid(), started_at - submitted_at, run_seconds))
+    return result
+
 
-# --- 2. Main Execution Block ---
+class PoolMetrics:
+    """
+    Collects the timings that workers send back and turns them into pool statistics:
+    latency histogram, tasks/sec, worker utilization and queue depth.
+
+    A background thread in the parent process drains the metrics queue.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.queue = multiprocessing.Queue()
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.end_time = None  # Frozen by close() so later snapshots stay accurate
+        self.submitted = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.total_run_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.busy_seconds_by_worker = {}  # pid -> seconds spent running tasks
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def task_submitted(self, count=1):
+        """Called by the parent every time it hands tasks to the pool."""
+        with self.lock:
+            self.submitted += count
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+
+    def _queue_depth(self):
+        # Tasks not finished yet, minus the ones the workers are busy running
+        return max(0, self.submitted - self.completed - self.workers)
+
+    def _collect(self):
+        """Background thread: reads timings until the None sentinel arrives."""
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            pid, wait_seconds, run_seconds = event
+            latency_ms = run_seconds * 1000
+            with self.lock:
+                self.completed += 1
+                self.total_run_seconds += run_seconds
+                self.total_wait_seconds += wait_seconds
+                self.max_run_seconds = max(self.max_run_seconds, run_seconds)
+                self.busy_seconds_by_worker[pid] = self.busy_seconds_by_worker.get(pid, 0.0) + run_seconds
+                for i, upper_edge in enumerate(LATENCY_BUCKETS_MS):
+                    if latency_ms <= upper_edge:
+                        self.bucket_counts[i] += 1
+                        break
+
+    def snapshot(self):
+        """Returns the current statistics as a plain dict (easy to print or save as JSON)."""
+        with self.lock:
+            elapsed = (self.end_time or time.perf_counter()) - self.start_time
+            completed = self.completed
+            histogram = {}
+            for upper_edge, count in zip(LATENCY_BUCKETS_MS, self.bucket_counts):
+                label = f"<={upper_edge:g}ms" if upper_edge != float('inf') else "slower"
+                histogram[label] = count
+            return {
+                'elapsed_seconds': round(elapsed, 3),
+                'workers': self.workers,
+                'submitted': self.submitted,
+                'completed': completed,
+                'queue_depth': self._queue_depth(),
+                'max_queue_depth': self.max_queue_depth,
+                'tasks_per_second': round(completed / elapsed, 2) if elapsed else 0.0,
+                'mean_latency_ms': round(self.total_run_seconds / completed * 1000, 3) if completed else 0.0,
+                'max_latency_ms': round(self.max_run_seconds * 1000, 3),
+                'mean_queue_wait_ms': round(self.total_wait_seconds / completed * 1000, 3) if completed else 0.0,
+                # Share of the available worker time actually spent hashing
+                'worker_utilization': round(self.total_run_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+                'busy_seconds_by_worker': {str(pid): round(busy, 3)
+                                           for pid, busy in self.busy_seconds_by_worker.items()},
+                'latency_histogram': histogram,
+            }
+
+    def format_report(self):
+        """One-line summary for the periodic reporter."""
+        stats = self.snapshot()
+        return (f"[METRICS] {stats['completed']}/{stats['submitted']} done | "
+                f"{stats['tasks_per_second']:.1f} tasks/s | "
+                f"mean {stats['mean_latency_ms']:.1f} ms | "
+                f"utilization {stats['worker_utilization']:.0%} | "
+                f"queue depth {stats['queue_depth']}")
+
+    def export_json(self, path):
+        """Saves a snapshot to a JSON file for later analysis (e.g. pool sizing)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def close(self):
+        """Stops the collector thread once every timing sent so far has been read."""
+        self.queue.put(None)
+        self._collector.join()
+        self.end_time = time.perf_counter()
+
+
+class MetricsReporter:
+    """Optional background thread that prints a PoolMetrics summary every few seconds."""
+
+    def __init__(self, metrics, interval=2.0):
+        self.metrics = metrics
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        # Event.wait returns True (and ends the loop) as soon as stop() is called
+        while not self._stop.wait(self.interval):
+            print(self.metrics.format_report())
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# --- 4. The Reusable Hashing Service (Process Pool) ---
+class PasswordHashingService:
+    """
+    Hashes large batches of passwords on a pool of worker processes that is
+    created ONCE and reused, instead of starting a brand new process per password.
+
+    Starting a process costs milliseconds; a persistent pool pays that only once,
+    and hands results back to the caller instead of just printing them.
+
+    Use it as a context manager so the workers are shut down afterwards:
+
+        with PasswordHashingService() as service:
+            results = service.hash_batch(["hunter2", "letmein"])  # [(salt, hash), ...]
+    """
+
+    def __init__(self, workers=None, kdf=None, instrument=False):
+        # Default to one worker per CPU core: hashing is CPU-bound
+        self.workers = workers or os.cpu_count() or 1
+        self.kdf = kdf or DEFAULT_KDF
+        # With instrument=True, every task reports its timings to self.metrics
+        self.metrics = PoolMetrics(self.workers) if instrument else None
+        if self.metrics:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker_metrics,
+                                                initargs=(self.metrics.queue,))
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes (and the metrics collector, if any)."""
+        self.executor.shutdown(wait=True)
+        if self.metrics:
+            self.metrics.close()
+
+    def _submit(self, func, *args):
+        """Submits one task, wrapped with timing when the pool is instrumented."""
+        if not self.metrics:
+            return self.executor.submit(func, *args)
+        self.metrics.task_submitted()
+        return self.executor.submit(run_timed, func, time.perf_counter(), *args)
+
+    def _map(self, func, *iterables, chunksize=1):
+        """Like executor.map, wrapped with timing when the pool is instrumented."""
+        if not self.metrics:
+            return self.executor.map(func, *iterables, chunksize=chunksize)
+        columns = [list(iterable) for iterable in iterables]
+        count = len(columns[0]) if columns else 0
+        self.metrics.task_submitted(count)
+        submitted_at = time.perf_counter()
+        return self.executor.map(run_timed, [func] * count, [submitted_at] * count, *columns,
+                                 chunksize=chunksize)
+
+    def warm_up(self):
+        """Starts all the worker processes now, so the first real batch doesn't pay for it."""
+        cheap_kdf = PBKDF2Backend(1)
+        list(self.executor.map(stretch_password, ["warm-up"] * self.workers, [None] * self.workers,
+                               [cheap_kdf] * self.workers))
+
+    def _chunksize(self, count):
+        # Send passwords to workers in chunks: fewer messages between processes
+        return max(1, count // (self.workers * 4))
+
+    def hash_batch(self, passwords, salts=None):
+        """
+        Hashes every password and returns a list of (salt, hash_hex) tuples
+        in the SAME ORDER as the input.
+        """
+        passwords = list(passwords)
+        salts = list(salts) if salts is not None else [None] * len(passwords)
+        return list(self._map(stretch_password, passwords, salts,
+                              [self.kdf] * len(passwords),
+                              chunksize=self._chunksize(len(passwords))))
+
+    def hash_as_completed(self, passwords):
+        """
+        Yields (index, salt, hash_hex) as soon as each password is done,
+        so the caller can start storing results before the whole batch finishes.
+        """
+        futures = {self._submit(stretch_password, password, None, self.kdf): index
+                   for index, password in enumerate(passwords)}
+        for future in as_completed(futures):
+            salt, final_hash = future.result()
+            yield futures[future], salt, final_hash
+
+    def verify_batch(self, items):
+        """
+        Verifies a list of (password, salt, hash_hex) and returns a list of booleans
+        in input order. The list is split into one chunk per worker.
+        """
+        items = list(items)
+        if not items:
+            return []
+        chunk_size = -(-len(items) // self.workers)  # Ceiling division
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        results = []
+        for chunk_result in self._map(verify_chunk, chunks, [self.kdf] * len(chunks)):
+            results.extend(chunk_result)
+        return results
+
+
+# --- 5. Password Verification with a Result Cache ---
+class VerificationCache:
+    """
+    Remembers RECENT SUCCESSFUL verifications so a burst of logins by the same
+    user doesn't redo the slow key stretching every time.
+
+    - Bounded: holds at most `max_entries` (the oldest entry is dropped first).
+    - TTL: an entry expires `ttl_seconds` after it was stored.
+    - Never stores the password: the key is an HMAC made with a random secret that
+      only lives in this process's memory.
+    - Failures are NOT cached, so a wrong password always costs the full hash.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()  # cache key -> expiry time
+        self._lock = threading.Lock()
+
+    def make_key(self, password, salt, hash_hex, kdf=None):
+        """Keyed digest of everything that identifies one successful verification."""
+        kdf = kdf or DEFAULT_KDF
+        message = b"\0".join([repr(kdf).encode(), salt, bytes.fromhex(hash_hex), password.encode('utf-8')])
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def contains(self, key):
+        """True if the key is cached and has not expired yet."""
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)  # Recently used: drop it last
+            return True
+
+    def add(self, key):
+        """Stores a successful verification, evicting the oldest if the cache is full."""
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl_seconds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PasswordVerifier:
+    """
+    Verification front end: checks the cache first, then hashes.
+
+    Batches go to a process pool that by default uses only HALF the CPU cores,
+    and single verify() calls share a semaphore of the same size, so a storm of
+    logins can't starve the rest of the application.
+
+        with PasswordVerifier() as verifier:
+            ok = verifier.verify("hunter2", salt, stored_hash)
+    """
+
+    def __init__(self, workers=None, kdf=None, cache=None):
+        self.kdf = kdf or DEFAULT_KDF
+        self.workers = workers or max(1, (os.cpu_count() or 1) // 2)
+        self.cache = cache if cache is not None else VerificationCache()
+        self.service = None  # The pool is only started when a batch needs it
+        # pbkdf2_hmac and scrypt release the GIL, so without a limit every calling thread
+        # would hash at the same time and use every core
+        self._hashing_slots = threading.BoundedSemaphore(self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.service:
+            self.service.close()
+            self.service = None
+
+    def verify(self, password, salt, hash_hex):
+        """Verifies ONE password in the calling thread (fast path for cached users)."""
+        key = self.cache.make_key(password, salt, hash_hex, self.kdf)
+        if self.cache.contains(key):
+            return True
+        with self._hashing_slots:  # At most `workers` hashes run at once; other callers wait here
+            ok = verify_password(password, salt, hash_hex, self.kdf)
+        if ok:
+            self.cache.add(key)
+        return ok
+
+    def verify_batch(self, items):
+        """
+        Verifies a list of (password, salt, hash_hex) and returns booleans in order.
+        Cached successes are answered at once, identical requests are only hashed
+        once, and the rest are split across the worker pool.
+        """
+        items = list(items)
+        results = [False] * len(items)
+        pending = {}  # cache key -> (item, [indexes that asked for it])
+        for index, (password, salt, hash_hex) in enumerate(items):
+            key = self.cache.make_key(password, salt, hash_hex, self.kdf)
+            if self.cache.contains(key):
+                results[index] = True
+            elif key in pending:
+                pending[key][1].append(index)
+            else:
+                pending[key] = ((password, salt, hash_hex), [index])
+
+        if pending:
+            if self.service is None:
+                self.service = PasswordHashingService(self.workers, self.kdf)
+            keys = list(pending)
+            outcomes = self.service.verify_batch(pending[key][0] for key in keys)
+            for key, ok in zip(keys, outcomes):
+                if ok:
+                    self.cache.add(key)
+                for index in pending[key][1]:
+                    results[index] = ok
+        return results
+
+
+# --- 6. Throughput Benchmark ---
+def run_benchmark(count=10000, iterations=1000, workers=None, kdf_name=PBKDF2Backend.name,
+                  metrics_path=None, report_every=None):
+    """
+    Compares the old approach (one new Process per password) with the reusable pool.
+    Uses fewer stretching iterations than normal so that process start-up cost,
+    which is what the pool saves, is visible in a reasonable time.
+    With metrics_path and/or report_every, the pool run is instrumented.
+    """
+    workers = workers or os.cpu_count() or 1
+    kdf = get_kdf(kdf_name)
+    kdf = kdf.with_cost(kdf.round_cost(iterations))
+    passwords = [f"benchmark-password-{i}" for i in range(count)]
+    print(f"--- Benchmark: {count} passwords, {kdf}, {workers} workers ---")
+
+    # A) Old approach: a fresh Process per password (run in waves of `workers` to avoid
+    #    starting thousands of processes at the same moment)
+    start = time.perf_counter()
+    for i in range(0, count, workers):
+        processes = [multiprocessing.Process(target=stretch_password, args=(password, None, kdf))
+                     for password in passwords[i:i + workers]]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    per_process_time = time.perf_counter() - start
+    print(f"Per-process : {per_process_time:8.2f}s  ({count / per_process_time:10.1f} passwords/sec)")
+
+    # B) New approach: one pool, reused for the whole batch
+    start = time.perf_counter()
+    instrument = bool(metrics_path or report_every)
+    with PasswordHashingService(workers, kdf, instrument=instrument) as service:
+        reporter = MetricsReporter(service.metrics, report_every).start() if report_every else None
+        results = service.hash_batch(passwords)
+        if reporter:
+            reporter.stop()
+    pool_time = time.perf_counter() - start
+    print(f"Process pool: {pool_time:8.2f}s  ({count / pool_time:10.1f} passwords/sec)")
+
+    if instrument:
+        # The service is closed now, so every worker timing has been collected
+        print(service.metrics.format_report())
+        if metrics_path:
+            service.metrics.export_json(metrics_path)
+            print(f"Pool metrics saved to: {metrics_path}")
+
+    assert len(results) == count
+    print(f"Speed-up: {per_process_time / pool_time:.1f}x")
+    return per_process_time, pool_time
+
+# --- 7. Main Execution Block ---
 if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Concurrent password hashing demo.")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Benchmark N passwords: per-process vs process pool (try 10000)")
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="Stretching iterations used by the benchmark (default: 1000)")
+    parser.add_argument("--kdf", choices=list(KDF_BACKENDS), default=PBKDF2Backend.name,
+                        help="KDF backend used by the benchmark")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="Instrument the benchmark's pool and save its metrics to PATH")
+    parser.add_argument("--report-every", type=float, metavar="SECONDS",
+                        help="Print pool metrics every SECONDS during the benchmark")
+    parser.add_argument("--calibrate", type=float, metavar="SECONDS",
+                        help="Show the cost each KDF backend needs for one hash to take SECONDS")
+    args = parser.parse_args()
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.iterations, kdf_name=args.kdf,
+                      metrics_path=args.metrics_json, report_every=args.report_every)
+        sys.exit(0)
+    if args.calibrate:
+        print(f"--- Calibrating KDF backends for {args.calibrate:.3f}s per hash ---")
+        for kdf_name in KDF_BACKENDS:
+            print(f"  {kdf_name:<15}: {calibrate_kdf(kdf_name, args.calibrate)}")
+        sys.exit(0)
     
     # Data: A list of passwords to hash concurrently
     tasks = [
@@ -56,7 +717,7 @@ if __name__ == "__main__":
     
     print("\n--- Starting CONCURRENT Password Hashing (Multiprocessing) ---")
     
-    start_time_concurrent = time.time()
+    start_time_concurrent = time.perf_counter()
     
     # 1. Create the processes
     for task_id, password in tasks:
@@ -71,10 +732,29 @@ if __name__ == "__main__":
     for process in processes:
         process.join()
         
-    end_time_concurrent = time.time()
+    end_time_concurrent = time.perf_counter()
     
     # Calculate and display the total time
     total_time = end_time_concurrent - start_time_concurrent
     print("\n----------------------------------------------------------------------")
     print(f"✅ All {len(tasks)} passwords hashed in: {total_time:.2f} seconds.")
     print("----------------------------------------------------------------------")
+
+    # 3. The same batch on the reusable pool: this time the results come BACK to us
+    print("\n--- Hashing the same passwords with the reusable process pool ---")
+    start_time_pool = time.perf_counter()
+    with PasswordHashingService() as service:
+        pool_results = service.hash_batch(password for _, password in tasks)
+    print(f"✅ Pool hashed {len(pool_results)} passwords in: {time.perf_counter() - start_time_pool:.2f} seconds.")
+    for (task_id, _), (salt, final_hash) in zip(tasks, pool_results):
+        print(f"   Task {task_id}: salt={salt.hex()[:8]}... hash={final_hash[:20]}...")
+
+    # 4. Verify logins: the second check of the same password comes from the cache
+    print("\n--- Verifying passwords (with result cache) ---")
+    salt, stored_hash = pool_results[1]
+    with PasswordVerifier() as verifier:
+        for attempt in ["hunter2", "hunter3", "hunter2"]:
+            start_time_verify = time.perf_counter()
+            ok = verifier.verify(attempt, salt, stored_hash)
+            elapsed_ms = (time.perf_counter() - start_time_verify) * 1000
+            print(f"   '{attempt}': {'✅ MATCH' if ok else '❌ NO MATCH'} ({elapsed_ms:.2f} ms)")
@@ -62,6 +62,122 @@ class DatabaseManager:
         self.cursor.execute(sql_select_filtered, (type_filter,))
         return self.cursor.fetchall()
 
+    # --- Port Scan Storage (used by port_scanner.py --db) ---
+
+    def create_scan_tables(self):
+        """
+        Creates the tables that keep port scan results, one row per scan run
+        plus one row per OPEN port found in that run.
+        """
+        sql_create_scan_tables = """
+        CREATE TABLE IF NOT EXISTS scan_runs (
+            id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL,
+            started TEXT NOT NULL,
+            finished TEXT,
+            port_start INTEGER NOT NULL,
+            port_end INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_scan_runs_target ON scan_runs (target, id);
+        CREATE TABLE IF NOT EXISTS scan_results (
+            run_id INTEGER NOT NULL REFERENCES scan_runs (id),
+            port INTEGER NOT NULL,
+            service TEXT,
+            PRIMARY KEY (run_id, port)
+        ) WITHOUT ROWID;
+        """
+        # executescript runs several statements at once and commits them
+        self.cursor.executescript(sql_create_scan_tables)
+
+    def start_scan_run(self, target, port_start, port_end):
+        """Registers a new scan run and returns its id (the key for all its results)."""
+        started = datetime.datetime.now().isoformat()
+        sql_insert_run = """
+        INSERT INTO scan_runs (target, started, port_start, port_end)
+        VALUES (?, ?, ?, ?);
+        """
+        self.cursor.execute(sql_insert_run, (target, started, port_start, port_end))
+        self.conn.commit()
+        return self.cursor.lastrowid
+
+    def save_scan_results(self, run_id, results, batch_size=5000):
+        """
+        Bulk-inserts (port, service) tuples for a scan run.
+        All batches go into ONE transaction: either every row is saved or none are,
+        and SQLite only has to sync to disk once, which keeps big scans cheap.
+        """
+        sql_insert_result = """
+        INSERT OR REPLACE INTO scan_results (run_id, port, service)
+        VALUES (?, ?, ?);
+        """
+        results = list(results)
+        # 'with self.conn' commits at the end, or rolls back if anything fails
+        with self.conn:
+            for i in range(0, len(results), batch_size):
+                batch = results[i:i + batch_size]
+                self.cursor.executemany(sql_insert_result, [(run_id, port, service) for port, service in batch])
+        return len(results)
+
+    def finish_scan_run(self, run_id):
+        """Marks a scan run as complete and logs a PORT_SCAN event in security_log."""
+        finished = datetime.datetime.now().isoformat()
+        with self.conn:
+            self.cursor.execute("UPDATE scan_runs SET finished = ? WHERE id = ?;", (finished, run_id))
+            self.cursor.execute("SELECT target, port_start, port_end FROM scan_runs WHERE id = ?;", (run_id,))
+            target, port_start, port_end = self.cursor.fetchone()
+            self.cursor.execute("SELECT COUNT(*) FROM scan_results WHERE run_id = ?;", (run_id,))
+            open_count = self.cursor.fetchone()[0]
+        self.insert_event('PORT_SCAN', target,
+                          f"Scan run {run_id}: {open_count} open ports in {port_start}-{port_end}.")
+
+    def get_previous_scan_run(self, run_id):
+        """Returns the id of the last FINISHED run of the same target before run_id (or None)."""
+        sql_select_previous = """
+        SELECT prev.id FROM scan_runs AS prev
+        JOIN scan_runs AS cur ON cur.id = ?
+        WHERE prev.target = cur.target AND prev.id < cur.id AND prev.finished IS NOT NULL
+        ORDER BY prev.id DESC LIMIT 1;
+        """
+        self.cursor.execute(sql_select_previous, (run_id,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def diff_scan_runs(self, run_id, previous_run_id=None):
+        """
+        Compares a scan run with the previous run of the same target.
+        Returns a dict with the previous run id and lists of (port, service) tuples:
+          'opened' - open now, but not open last time (only ports the previous run scanned)
+          'closed' - open last time, but not open now (only ports this run actually scanned)
+        """
+        if previous_run_id is None:
+            previous_run_id = self.get_previous_scan_run(run_id)
+        diff = {'previous_run': previous_run_id, 'opened': [], 'closed': []}
+        if previous_run_id is None:
+            return diff
+
+        sql_select_opened = """
+        SELECT cur.port, cur.service FROM scan_results AS cur
+        JOIN scan_runs AS prev_run ON prev_run.id = ?
+        LEFT JOIN scan_results AS prev ON prev.run_id = prev_run.id AND prev.port = cur.port
+        WHERE cur.run_id = ? AND prev.port IS NULL
+          AND cur.port BETWEEN prev_run.port_start AND prev_run.port_end
+        ORDER BY cur.port;
+        """
+        self.cursor.execute(sql_select_opened, (previous_run_id, run_id))
+        diff['opened'] = self.cursor.fetchall()
+
+        sql_select_closed = """
+        SELECT prev.port, prev.service FROM scan_results AS prev
+        JOIN scan_runs AS run ON run.id = ?
+        LEFT JOIN scan_results AS cur ON cur.run_id = run.id AND cur.port = prev.port
+        WHERE prev.run_id = ? AND cur.port IS NULL
+          AND prev.port BETWEEN run.port_start AND run.port_end
+        ORDER BY prev.port;
+        """
+        self.cursor.execute(sql_select_closed, (run_id, previous_run_id))
+        diff['closed'] = self.cursor.fetchall()
+        return diff
+
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
@@ -100,6 +216,22 @@ if __name__ == "__main__":
         print(f"  | Time: {event[1][11:19]} | IP: {event[3]} | Details: {event[4]}")
 
 
+    # 3. Store two scan runs of the same target and compare them
+    db_manager.create_scan_tables()
+    first_run = db_manager.start_scan_run('127.0.0.1', 1, 1024)
+    db_manager.save_scan_results(first_run, [(22, 'SSH (Secure Shell)'), (80, 'HTTP (Web Server)')])
+    db_manager.finish_scan_run(first_run)
+    second_run = db_manager.start_scan_run('127.0.0.1', 1, 1024)
+    db_manager.save_scan_results(second_run, [(22, 'SSH (Secure Shell)'), (445, 'SMB (File Sharing)')])
+    db_manager.finish_scan_run(second_run)
+
+    scan_diff = db_manager.diff_scan_runs(second_run)
+    print(f"\n--- SCAN DIFF: Run {second_run} vs Run {scan_diff['previous_run']} ---")
+    for port, service in scan_diff['opened']:
+        print(f"  + Port {port:<5} newly OPEN ({service})")
+    for port, service in scan_diff['closed']:
+        print(f"  - Port {port:<5} now CLOSED ({service})")
+
     db_manager.close()
     
     print("\nDatabase closed.")
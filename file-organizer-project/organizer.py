@@ -1,8 +1,43 @@
 import os
 import shutil # <--- Added for robust file moving
+import time
+import argparse
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ⚠️ IMPORTANT: Changed to a RAW STRING (r"...") for Windows paths
-SOURCE_DIR =   # Replace with your actual path!  
+SOURCE_DIR = r"C:\Users\YourName\Downloads"  # Replace with your actual path!  
+
+# Moves are I/O bound (waiting on the disk), so several threads can run them at once
+DEFAULT_MOVE_WORKERS = 8
+# Moves to ANOTHER drive are real copies: only a few at a time, so the disks aren't thrashed
+DEFAULT_COPY_WORKERS = 2
+# Cross-drive copies are read and written in chunks of this size
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Files the organizer keeps for itself start with this prefix and are never organized
+INTERNAL_FILE_PREFIX = '.organizer_'
+# Incremental mode: log of every processed file, and the folder state from the last run
+MANIFEST_FILE = '.organizer_manifest.jsonl'
+STATE_FILE = '.organizer_state.json'
+
+# --- Duplicate detection settings ---
+DUPLICATES_FOLDER = 'Duplicates'
+# Hashes are cached here (inside the organized folder) so re-runs don't re-read files
+HASH_INDEX_FILE = '.organizer_hash_index.json'
+# Size of the first/last block read for the quick "edges" hash
+EDGE_BLOCK_SIZE = 64 * 1024
+# Read size for full-file hashing (keeps memory use small for huge videos)
+HASH_CHUNK_SIZE = 1024 * 1024
+DEDUP_MODES = ('skip', 'hardlink', 'move')
+
+# --- Watch (daemon) mode settings ---
+DEFAULT_POLL_INTERVAL = 2.0   # Seconds between checks for new files
+DEFAULT_SETTLE_SECONDS = 3.0  # A file must be unchanged this long before it is moved
+# Browsers and download tools use these while a file is still downloading
+PARTIAL_DOWNLOAD_EXTENSIONS = ('.crdownload', '.part', '.partial', '.download', '.tmp')
 
 # Dictionary mapping extensions to folder names
 FILE_CATEGORIES = {
@@ -12,8 +47,8 @@ FILE_CATEGORIES = {
     ('.mp4', '.mov', '.avi', '.mkv', '.wmv'): 'Videos',
     # Documents
     ('.pdf', '.docx', '.doc', '.txt', '.pptx', '.xlsx'): 'Documents',
-    # Archives
-    ('.zip', '.rar', '.7z'): 'Archives',
+    # Archives (multi-part extensions like .tar.gz are matched before .gz)
+    ('.zip', '.rar', '.7z', '.gz', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz'): 'Archives',
     # Code/Scripts
     ('.py', '.js', '.html', '.css', '.c', '.cpp'): 'Code',
     # Executables
@@ -21,6 +56,210 @@ FILE_CATEGORIES = {
     # Others
     # Default category for anything not listed
 }
+
+# Folder used when no rule matches
+DEFAULT_CATEGORY = 'Others'
+
+# "Magic bytes": how common file types start, for files with a missing or unknown extension.
+# Each entry is (offset, bytes expected at that offset, category folder).
+MAGIC_SIGNATURES = [
+    (0, b'\x89PNG\r\n\x1a\n', 'Images'),
+    (0, b'\xff\xd8\xff', 'Images'),
+    (0, b'GIF87a', 'Images'),
+    (0, b'GIF89a', 'Images'),
+    (0, b'%PDF-', 'Documents'),
+    (0, b'PK\x03\x04', 'Archives'),
+    (0, b'Rar!\x1a\x07', 'Archives'),
+    (0, b'7z\xbc\xaf\x27\x1c', 'Archives'),
+    (0, b'\x1f\x8b', 'Archives'),
+    (0, b'MZ', 'Executables'),
+    (4, b'ftyp', 'Videos'),
+    (8, b'AVI ', 'Videos'),
+    (0, b'\x1a\x45\xdf\xa3', 'Videos'),
+]
+# How many bytes to read from the start of a file for sniffing
+SNIFF_BYTES = 16
+
+
+def build_extension_index(categories):
+    """
+    Turns FILE_CATEGORIES ({(ext, ext, ...): folder}) around into a reverse index
+    ({ext: folder}), built ONCE, so finding a file's folder is a single dict lookup
+    however many categories there are.
+    """
+    index = {}
+    for extensions, folder_name in categories.items():
+        for ext in extensions:
+            ext = ext.lower()
+            if not ext.startswith('.'):
+                ext = '.' + ext
+            index[ext] = folder_name
+    return index
+
+
+def load_category_rules(rules_path):
+    """
+    Reads user rules from a JSON file shaped like:
+        {"Music": [".mp3", ".flac"], "Archives": [".tar.zst"]}
+    and returns them in the same shape as FILE_CATEGORIES.
+    """
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    return {tuple(extensions): folder_name for folder_name, extensions in rules.items()}
+
+
+class CategoryResolver:
+    """
+    Decides which category folder a file belongs in.
+
+    - Extensions are looked up in a precomputed reverse index (O(1) per file).
+    - Multi-part extensions (.tar.gz) are supported: the longest known one wins.
+    - With sniff=True, files whose extension is unknown are identified from their
+      first few bytes (see MAGIC_SIGNATURES).
+    """
+
+    def __init__(self, categories=None, extra_rules=None, sniff=False):
+        self.index = build_extension_index(categories if categories is not None else FILE_CATEGORIES)
+        # User rules are applied last, so they override the built-in ones
+        if extra_rules:
+            self.index.update(build_extension_index(extra_rules))
+        self.sniff = sniff
+        # Longest extension in the index, in dots (e.g. 2 for '.tar.gz')
+        self.max_parts = max((ext.count('.') for ext in self.index), default=1)
+
+    def split_name(self, file_name):
+        """
+        Splits a file name into (base name, extension), using the LONGEST extension
+        the index knows about: 'backup.tar.gz' -> ('backup', '.tar.gz').
+        Falls back to os.path.splitext for unknown extensions.
+        """
+        lower_name = file_name.lower()
+        # Try '.a.b.c', then '.b.c', then '.c' (at most max_parts dict lookups)
+        dot_positions = []
+        position = len(lower_name)
+        while len(dot_positions) < self.max_parts:
+            position = lower_name.rfind('.', 0, position)
+            if position <= 0:  # No more dots, or a hidden file like '.bashrc'
+                break
+            dot_positions.append(position)
+        for position in reversed(dot_positions):
+            if lower_name[position:] in self.index:
+                return file_name[:position], file_name[position:]
+        return os.path.splitext(file_name)
+
+    def sniff_category(self, file_path):
+        """Guesses the category from the file's first bytes (None if unrecognised)."""
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None
+        for offset, signature, folder_name in MAGIC_SIGNATURES:
+            if head[offset:offset + len(signature)] == signature:
+                return folder_name
+        return None
+
+    def resolve(self, file_name, file_path=None):
+        """Returns the category folder for a file (DEFAULT_CATEGORY if nothing matches)."""
+        ext = self.split_name(file_name)[1].lower()
+        folder_name = self.index.get(ext)
+        if folder_name:
+            return folder_name
+        if self.sniff and file_path:
+            return self.sniff_category(file_path) or DEFAULT_CATEGORY
+        return DEFAULT_CATEGORY
+
+
+# Resolver used when none is passed in (built-in categories, no sniffing)
+DEFAULT_RESOLVER = CategoryResolver()
+
+
+class DestinationNameIndex:
+    """
+    Remembers which file names already exist in each category folder, so picking
+    a free name like 'report(7).pdf' doesn't cost a disk check per attempt.
+
+    - Each folder is listed ONCE (the first time it is used).
+    - For every (name, extension) the next suffix to try is remembered, so the
+      1000th 'report.pdf' gets its name straight away instead of trying (1)...(999).
+    - claim() creates the destination with exclusive-create, so even if another
+      program writes a file with the same name meanwhile, we never overwrite it.
+    """
+
+    def __init__(self):
+        self._names = {}        # category_path -> set of names already taken
+        self._next_suffix = {}  # (category_path, base, ext) -> next counter to try
+        self._lock = threading.Lock()
+
+    def _taken_names(self, category_path):
+        """Returns (and on first use, builds) the set of names taken in a folder."""
+        if category_path not in self._names:
+            names = set()
+            if os.path.isdir(category_path):
+                with os.scandir(category_path) as entries:
+                    # normcase: on Windows 'A.txt' and 'a.txt' are the same file
+                    names = {os.path.normcase(entry.name) for entry in entries}
+            self._names[category_path] = names
+        return self._names[category_path]
+
+    def reserve(self, category_path, original_name, ext):
+        """Picks the next free name in memory only and returns the full destination path."""
+        with self._lock:
+            taken = self._taken_names(category_path)
+            key = (category_path, original_name, ext)
+            counter = self._next_suffix.get(key, 0)
+            while True:
+                # Counter 0 means "keep the original name"
+                new_name = f"{original_name}{ext}" if counter == 0 else f"{original_name}({counter}){ext}"
+                counter += 1
+                if os.path.normcase(new_name) not in taken:
+                    break
+            taken.add(os.path.normcase(new_name))
+            self._next_suffix[key] = counter
+            return os.path.join(category_path, new_name)
+
+    def claim(self, category_path, original_name, ext):
+        """
+        Reserves a name AND creates an empty placeholder file there with exclusive-create
+        (O_EXCL fails if the file already exists). The real file is then moved on top of it.
+        """
+        while True:
+            new_path = self.reserve(category_path, original_name, ext)
+            try:
+                os.close(os.open(new_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return new_path
+            except FileExistsError:
+                # Someone else created it after we listed the folder: try the next suffix
+                continue
+
+    def claim_planned(self, planned_path, original_name, ext):
+        """
+        Claims the exact path the planner picked; if another program has taken it
+        since the plan was made, falls back to the next free suffix.
+        """
+        try:
+            os.close(os.open(planned_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return planned_path
+        except FileExistsError:
+            return self.claim(os.path.dirname(planned_path), original_name, ext)
+
+
+def move_onto_claimed(item_path, new_path):
+    """Moves a file onto the placeholder made by DestinationNameIndex.claim."""
+    try:
+        # os.replace is a single rename on the same drive (and replaces the placeholder)
+        os.replace(item_path, new_path)
+    except OSError:
+        # Different drive: shutil.move copies over the placeholder, then deletes the source
+        try:
+            shutil.move(item_path, new_path)
+        except Exception:
+            # Don't leave an empty placeholder behind
+            if os.path.exists(new_path) and os.path.getsize(new_path) == 0:
+                os.remove(new_path)
+            raise
+
+
 def organize_files(source_dir):
     print(f"--- Starting organization in: {source_dir} ---")
     
@@ -28,45 +267,42 @@ def organize_files(source_dir):
         print(f"Error: Source directory not found at {source_dir}")
         return
 
+    # Built once per run: knows the names already in each category folder
+    name_index = DestinationNameIndex()
+
     for item in os.listdir(source_dir):
         item_path = os.path.join(source_dir, item)
         
-        if os.path.isdir(item_path):
+        if os.path.isdir(item_path) or item.startswith(INTERNAL_FILE_PREFIX):
             continue
         
         # 1. Determine category folder and get original name/extension
-        original_name, ext = os.path.splitext(item)
-        ext = ext.lower()
+        # (The extension keeps its case: the resolver lowercases it only for the category lookup)
+        original_name, ext = DEFAULT_RESOLVER.split_name(item)
         
-        category_folder = 'Others'
-        for extensions, folder_name in FILE_CATEGORIES.items():
-            if ext in extensions:
-                category_folder = folder_name
-                break
+        # One dictionary lookup in the precomputed extension index
+        category_folder = DEFAULT_RESOLVER.resolve(item)
         
         category_path = os.path.join(source_dir, category_folder)
         os.makedirs(category_path, exist_ok=True)
         
         # 2. --- DUPLICATE HANDLING LOGIC STARTS HERE ---
         
-        # Start with the intended path
-        new_path = os.path.join(category_path, item)
-        counter = 1
-        
-        # Loop until a unique file name is found
-        while os.path.exists(new_path):
-            # Create a new file name: original_name(counter).ext
-            new_item_name = f"{original_name}({counter}){ext}"
-            new_path = os.path.join(category_path, new_item_name)
-            counter += 1
+        # Ask the name index for a unique name: original_name(counter).ext if needed.
+        # It remembers the names in the folder, so there is no os.path.exists loop.
+        try:
+            new_path = name_index.claim(category_path, original_name, ext)
+        except OSError as e:
+            print(f'Error moving {item}: {e}')
+            continue
         
         # --- DUPLICATE HANDLING LOGIC ENDS HERE ---
         
         # 3. Move the file
         try:
-            shutil.move(item_path, new_path)
+            move_onto_claimed(item_path, new_path)
             # Check if we renamed the file for a more informative message
-            if counter > 1:
+            if os.path.basename(new_path) != item:
                 print(f'Conflict: Renamed and moved **{item}** to **{new_path}**')
             else:
                 print(f'Moved: **{item}** to **{category_folder}/**')
@@ -76,11 +312,938 @@ def organize_files(source_dir):
     print(f"--- Organization complete! ---")
 
 
+# --- DEDUPLICATION: size -> first/last block -> full hash ---
+
+class HashIndex:
+    """
+    Small on-disk cache of file hashes, keyed by (path, size, mtime).
+    If a file's size and modification time haven't changed, its cached hash is reused,
+    so re-runs over a big media library don't read unchanged files again.
+    """
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self.entries = {}  # path -> {'size', 'mtime_ns', 'edges', 'full'}
+        self.changed = False
+        self._lock = threading.Lock()
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Ignoring unreadable hash index {index_path}: {e}")
+
+    def get(self, path, size, mtime_ns, kind):
+        """Returns the cached 'edges' or 'full' hash, or None if missing/out of date."""
+        entry = self.entries.get(path)
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            return entry.get(kind)
+        return None
+
+    def put(self, path, size, mtime_ns, kind, digest):
+        with self._lock:
+            entry = self.entries.get(path)
+            if not entry or entry['size'] != size or entry['mtime_ns'] != mtime_ns:
+                entry = {'size': size, 'mtime_ns': mtime_ns}
+                self.entries[path] = entry
+            entry[kind] = digest
+            self.changed = True
+
+    def rename(self, old_path, new_path):
+        """Keeps a file's cached hashes when the organizer moves it."""
+        with self._lock:
+            if old_path in self.entries:
+                self.entries[new_path] = self.entries.pop(old_path)
+                self.changed = True
+
+    def save(self):
+        if not self.index_path or not self.changed:
+            return
+        # Forget files that no longer exist, then write atomically
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.index_path)
+        self.changed = False
+
+
+def hash_edges(path, size):
+    """Quick hash of the first and last EDGE_BLOCK_SIZE bytes (plus the size)."""
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(EDGE_BLOCK_SIZE))
+        if size > EDGE_BLOCK_SIZE:
+            f.seek(max(EDGE_BLOCK_SIZE, size - EDGE_BLOCK_SIZE))
+            digest.update(f.read(EDGE_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def hash_full(path):
+    """Full-content hash, read in chunks so memory use stays small."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _group_by_hash(files, kind, hash_function, hash_index, executor):
+    """
+    Splits a group of (path, size, mtime_ns) into sub-groups with the same hash,
+    hashing in parallel and reusing cached hashes. Only groups of 2+ are returned.
+    """
+    def cached_hash(file_info):
+        path, size, mtime_ns = file_info
+        digest = hash_index.get(path, size, mtime_ns, kind)
+        if digest is None:
+            digest = hash_function(path, size) if kind == 'edges' else hash_function(path)
+            hash_index.put(path, size, mtime_ns, kind, digest)
+        return digest
+
+    groups = {}
+    for file_info, digest in zip(files, executor.map(cached_hash, files)):
+        groups.setdefault(digest, []).append(file_info)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(files, hash_index, workers=DEFAULT_MOVE_WORKERS, must_include=None):
+    """
+    Finds files with identical content among `files` (a list of (path, size, mtime_ns)).
+    Empty files are never duplicates of each other (__init__.py, .gitkeep and
+    placeholders are all "identical", but mean different things), so they're skipped.
+    Cheapest check first, so most files are never read completely:
+      1. group by size (free - already known from the directory listing)
+      2. hash only the first and last block of same-size files
+      3. full streaming hash, only for files that still match
+    With must_include (a set of paths), groups without any of those paths are dropped
+    before each hashing step: duplicates among already-organized files aren't wanted.
+    Returns a list of groups; each group is a list of paths with identical content.
+    """
+    def wanted(group):
+        return len(group) > 1 and (must_include is None or
+                                   any(path in must_include for path, _, _ in group))
+
+    by_size = {}
+    for file_info in files:
+        if file_info[1]:
+            by_size.setdefault(file_info[1], []).append(file_info)
+
+    duplicate_groups = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for same_size in by_size.values():
+            if not wanted(same_size):
+                continue
+            for same_edges in _group_by_hash(same_size, 'edges', hash_edges, hash_index, executor):
+                if not wanted(same_edges):
+                    continue
+                for same_content in _group_by_hash(same_edges, 'full', hash_full, hash_index, executor):
+                    duplicate_groups.append([path for path, _, _ in same_content])
+    return duplicate_groups
+
+
+def list_existing_files(folder_path):
+    """Returns (path, size, mtime_ns) for every file directly inside a folder."""
+    files = []
+    if os.path.isdir(folder_path):
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    info = entry.stat(follow_symlinks=False)
+                    files.append((entry.path, info.st_size, info.st_mtime_ns))
+    return files
+
+
+def link_onto_claimed(original_path, new_path):
+    """Replaces the placeholder at new_path with a hard link to original_path."""
+    temp_path = new_path + '.link-tmp'
+    os.link(original_path, temp_path)
+    os.replace(temp_path, new_path)
+
+
+# --- RECURSIVE + INCREMENTAL SCANNING WITH A MANIFEST ---
+
+def scan_source_files(source_dir, output_folders, recursive=False, previous_dirs=None, need_stat=False):
+    """
+    Collects the files to organize as (name, path, size, mtime_ns) tuples
+    (size and mtime_ns are None unless need_stat is True).
+
+    With previous_dirs (the state saved by the last incremental run), a folder whose
+    modification time hasn't changed is NOT listed again: no file was added to or
+    removed from it. Only its known sub-folders and the few files we deliberately
+    left in it are checked. That keeps the work proportional to what changed.
+
+    Returns (files, dirs) where dirs maps every visited folder to its state. A folder's
+    mtime_ns is taken just BEFORE it is listed: a file that lands in it later (even
+    during this run) changes it again, so the next run lists the folder again.
+    """
+    previous_dirs = previous_dirs or {}
+    files = []
+    dirs = {}
+    folders_to_visit = [source_dir]
+
+    while folders_to_visit:
+        dir_path = folders_to_visit.pop()
+        try:
+            dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            continue  # Folder was removed meanwhile
+        previous = previous_dirs.get(dir_path)
+
+        if previous and previous.get('mtime_ns') == dir_mtime_ns:
+            # Unchanged folder: only re-check the files we left here last time
+            kept = {}
+            for name, (size, mtime_ns) in previous.get('kept', {}).items():
+                path = os.path.join(dir_path, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                if info.st_size == size and info.st_mtime_ns == mtime_ns:
+                    kept[name] = [size, mtime_ns]
+                else:
+                    files.append((name, path, info.st_size, info.st_mtime_ns))
+            subdirs = [path for path in previous.get('subdirs', []) if recursive]
+            dirs[dir_path] = {'listed': False, 'mtime_ns': dir_mtime_ns, 'subdirs': subdirs, 'kept': kept}
+            folders_to_visit.extend(subdirs)
+            continue
+
+        subdirs = []
+        kept = {}
+        previous_kept = previous.get('kept', {}) if previous else {}
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Never collect files back out of our own output folders, and don't
+                    # follow folder shortcuts (symlinks) - they may point anywhere
+                    if (recursive and not entry.is_symlink() and
+                            not (dir_path == source_dir and entry.name in output_folders)):
+                        subdirs.append(entry.path)
+                    continue
+                if entry.name.startswith(INTERNAL_FILE_PREFIX):
+                    continue
+                size = mtime_ns = None
+                if need_stat:
+                    info = entry.stat(follow_symlinks=False)
+                    size, mtime_ns = info.st_size, info.st_mtime_ns
+                    # Left here on purpose last time and not changed since: nothing to do
+                    if previous_kept.get(entry.name) == [size, mtime_ns]:
+                        kept[entry.name] = [size, mtime_ns]
+                        continue
+                files.append((entry.name, entry.path, size, mtime_ns))
+        dirs[dir_path] = {'listed': True, 'mtime_ns': dir_mtime_ns, 'subdirs': subdirs, 'kept': kept}
+        folders_to_visit.extend(subdirs)
+
+    return files, dirs
+
+
+def stat_files(paths):
+    """Returns (name, path, size, mtime_ns) for each path that is still an existing file."""
+    files = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            files.append((os.path.basename(path), path, info.st_size, info.st_mtime_ns))
+    return files
+
+
+class OrganizerManifest:
+    """
+    Keeps two small files inside the organized folder:
+
+    - MANIFEST_FILE: an append-only log (JSON Lines) with one record per processed file:
+      run id, original path, size, mtime and destination. Used by undo_last_run().
+    - STATE_FILE: each visited folder's modification time, sub-folders and the files
+      deliberately left in it, so the next run can skip folders that haven't changed.
+    """
+
+    def __init__(self, source_dir):
+        self.source_dir = source_dir
+        self.manifest_path = os.path.join(source_dir, MANIFEST_FILE)
+        self.state_path = os.path.join(source_dir, STATE_FILE)
+        # Run ids sort in time order, e.g. '20240131-142501-123456'
+        self.run_id = time.strftime('%Y%m%d-%H%M%S') + f"-{time.time_ns() // 1000 % 1000000:06d}"
+
+    def make_record(self, source_path, file_info, destination, action):
+        size, mtime_ns = file_info
+        return {'run': self.run_id, 'source': source_path, 'size': size, 'mtime_ns': mtime_ns,
+                'destination': destination, 'action': action}
+
+    def append(self, records):
+        """Adds this run's records to the end of the manifest (never rewrites old ones)."""
+        if not records:
+            return
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+    def read_records(self):
+        records = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        return records
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('dirs', {})
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable state file {self.state_path}: {e}")
+            return {}
+
+    def save_state(self, dirs, kept_in_place=None, failed_dirs=()):
+        """
+        Saves each folder's state with the mtime it had when it was LISTED. This run's
+        own moves change it, so a folder we moved files out of is listed once more next
+        time (and finds nothing), but a file that arrived mid-run is never missed.
+        Folders with errors get no mtime, so the failed files are retried.
+
+        Written in place rather than via a temp file + rename: a rename would change
+        the organized folder's mtime on every run. A half-written state file is
+        harmless, because load_state ignores it and the next run lists everything.
+        """
+        state = {}
+        for dir_path, dir_state in dirs.items():
+            kept = dict(dir_state['kept'])
+            kept.update((kept_in_place or {}).get(dir_path, {}))
+            mtime_ns = None if dir_path in failed_dirs else dir_state['mtime_ns']
+            state[dir_path] = {'mtime_ns': mtime_ns, 'subdirs': dir_state['subdirs'], 'kept': kept}
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'dirs': state}, f)
+
+    def undo_last_run(self, verbose=True):
+        """
+        Replays the most recent run in REVERSE: moves every file from its destination
+        back to where it came from, then removes that run from the manifest.
+        Returns the number of files restored.
+        """
+        records = self.read_records()
+        if not records:
+            print("Nothing to undo: the manifest is empty.")
+            return 0
+        last_run = records[-1]['run']
+        to_undo = [record for record in records if record['run'] == last_run]
+        remaining = [record for record in records if record['run'] != last_run]
+
+        restored = 0
+        for record in reversed(to_undo):
+            source, destination = record['source'], record['destination']
+            if not destination:
+                continue  # File was left in place, nothing to move back
+            if not os.path.exists(destination):
+                print(f"Undo: {destination} no longer exists, skipping.")
+                continue
+            if os.path.exists(source):
+                print(f"Undo: {source} already exists, leaving {destination} where it is.")
+                remaining.append(record)
+                continue
+            os.makedirs(os.path.dirname(source), exist_ok=True)
+            move_onto_claimed(destination, source)
+            restored += 1
+            if verbose:
+                print(f"Undo: Restored **{destination}** to **{source}**")
+
+        # Rewrite the manifest without the undone run, and force a full rescan next time
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in remaining:
+                f.write(json.dumps(record) + '\n')
+        os.replace(temp_path, self.manifest_path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        print(f"--- Undo complete: {restored} files restored from run {last_run} ---")
+        return restored
+
+
+# --- PLANNER: work out every move first, then carry the plan out ---
+
+def device_of(path, cache):
+    """
+    Returns the device (drive) id of a path, or of its nearest existing parent
+    for folders that don't exist yet. Results are cached per path.
+    """
+    if path not in cache:
+        try:
+            cache[path] = os.stat(path).st_dev
+        except FileNotFoundError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                raise
+            cache[path] = device_of(parent, cache)
+    return cache[path]
+
+
+def copy_across_devices(item_path, new_path):
+    """
+    Moves a file to another drive: copies it in chunks to a temporary '.partial' file,
+    swaps that onto the claimed destination, and only then deletes the source.
+    """
+    temp_path = new_path + '.partial'
+    try:
+        with open(item_path, 'rb') as source_file, open(temp_path, 'wb') as target_file:
+            shutil.copyfileobj(source_file, target_file, COPY_CHUNK_SIZE)
+        shutil.copystat(item_path, temp_path)
+        os.replace(temp_path, new_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.remove(item_path)
+
+
+def perform_move(name_index, move, link_to=None):
+    """
+    Worker task: claims the planned destination (exclusive-create), then
+      - same drive:    a single rename (os.replace, i.e. os.rename that may replace our placeholder)
+      - another drive: a chunked copy (copy_across_devices)
+      - link_to given: a hard link to the kept copy instead of moving the data
+    Returns (new_path, error) instead of raising.
+    """
+    new_path = None
+    try:
+        original_name, ext = move['_name_parts']
+        new_path = name_index.claim_planned(move['destination'], original_name, ext)
+        if link_to:
+            try:
+                link_onto_claimed(link_to, new_path)
+                os.remove(move['source'])
+                return new_path, None
+            except OSError:
+                pass  # Hard links can't cross drives (or the drive doesn't support them): move instead
+        if move['cross_device']:
+            copy_across_devices(move['source'], new_path)
+        else:
+            os.replace(move['source'], new_path)
+        return new_path, None
+    except Exception as e:
+        # Don't leave an empty placeholder behind
+        if new_path and os.path.exists(new_path) and os.path.getsize(new_path) == 0:
+            os.remove(new_path)
+        return new_path, e
+
+
+class MovePlan:
+    """
+    The complete list of what a run WOULD do, worked out before anything is touched:
+    every file's destination (with name conflicts already resolved), which moves
+    cross to another drive, and how many bytes those will copy.
+
+    Each move is a dict with: source, destination, category, size, action,
+    renamed, cross_device, duplicate_of. Actions:
+      'move'      - normal move into its category folder
+      'hardlink'  - duplicate, becomes a hard link to the kept copy
+      'duplicate' - duplicate, moved into the Duplicates folder
+      'skip'      - duplicate, left where it is
+    """
+
+    def __init__(self, source_dir, dedup=None):
+        self.source_dir = source_dir
+        self.dedup = dedup
+        self.created = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.moves = []
+        # Reservations made while planning are reused when the plan is carried out
+        self.name_index = DestinationNameIndex()
+        self._device_cache = {}
+
+    def add(self, item_path, category_folder, target_folder, name_parts, size, action, duplicate_of=None):
+        """Plans one file. The destination name is reserved in memory only (no disk writes)."""
+        item = os.path.basename(item_path)
+        destination = None
+        cross_device = False
+        if action != 'skip':
+            destination = self.name_index.reserve(target_folder, *name_parts)
+            cross_device = (device_of(os.path.dirname(item_path), self._device_cache) !=
+                            device_of(target_folder, self._device_cache))
+            # Only copies across drives really need the size; stat just those
+            if size is None and cross_device:
+                size = os.stat(item_path).st_size
+        self.moves.append({
+            'source': item_path, 'destination': destination, 'category': category_folder,
+            'size': size, 'action': action,
+            'renamed': destination is not None and os.path.basename(destination) != item,
+            'cross_device': cross_device, 'duplicate_of': duplicate_of,
+            '_name_parts': name_parts,  # Needed again if the planned name is taken later
+        })
+
+    def summary(self):
+        categories = {}
+        for move in self.moves:
+            categories[move['category']] = categories.get(move['category'], 0) + 1
+        cross_device = [move for move in self.moves if move['cross_device']]
+        return {
+            'files': len(self.moves),
+            'moves': sum(1 for move in self.moves if move['action'] != 'skip'),
+            'renamed': sum(1 for move in self.moves if move['renamed']),
+            'duplicates': sum(1 for move in self.moves if move['action'] != 'move'),
+            'cross_device_moves': len(cross_device),
+            'bytes_to_copy': sum(move['size'] or 0 for move in cross_device),
+            'categories': categories,
+        }
+
+    def to_dict(self):
+        """JSON-friendly version of the plan (internal '_' fields are left out)."""
+        return {
+            'source_dir': self.source_dir,
+            'created': self.created,
+            'dedup': self.dedup,
+            'summary': self.summary(),
+            'moves': [{key: value for key, value in move.items() if not key.startswith('_')}
+                      for move in self.moves],
+        }
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_plan(self, verbose=True):
+        """Prints the plan for review (every move with verbose=True, else just the summary)."""
+        if verbose:
+            for move in self.moves:
+                source = os.path.relpath(move['source'], self.source_dir)
+                if move['action'] == 'skip':
+                    print(f"[PLAN] skip      {source} (same content as {move['duplicate_of']})")
+                    continue
+                notes = []
+                if move['renamed']:
+                    notes.append('renamed')
+                if move['cross_device']:
+                    notes.append(f"copy across drives, {format_bytes(move['size'] or 0)}")
+                note = f" ({', '.join(notes)})" if notes else ''
+                print(f"[PLAN] {move['action']:<9} {source} -> "
+                      f"{os.path.relpath(move['destination'], self.source_dir)}{note}")
+        summary = self.summary()
+        print(f"--- Plan: {summary['moves']} moves ({summary['renamed']} renamed, "
+              f"{summary['duplicates']} duplicates), {summary['cross_device_moves']} across drives "
+              f"({format_bytes(summary['bytes_to_copy'])} to copy) ---")
+
+
+def format_bytes(size):
+    """Human-friendly size, e.g. 1536 -> '1.5 KB'."""
+    for unit in ('bytes', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def build_move_plan(source_dir, source_files, resolver, dedup=None, workers=DEFAULT_MOVE_WORKERS,
+                    output_folders=()):
+    """
+    Works out the full MovePlan for a list of (name, path, size, mtime_ns) files,
+    including duplicate detection when dedup is set. Nothing on disk is changed;
+    the caller decides whether to save the hash cache. Returns (plan, hash_index or None).
+    """
+    plan = MovePlan(source_dir, dedup)
+
+    # Dedup: compare the new files with each other and with what's already organized
+    duplicate_of = {}  # duplicate source path -> path of the copy we keep
+    hash_index = None
+    if dedup:
+        hash_index = HashIndex(os.path.join(source_dir, HASH_INDEX_FILE))
+        existing_files = []
+        for category_folder in set(output_folders) - {DUPLICATES_FOLDER}:
+            existing_files.extend(list_existing_files(os.path.join(source_dir, category_folder)))
+        source_paths = {path for _, path, _, _ in source_files}
+        candidates = [(path, size, mtime_ns) for _, path, size, mtime_ns in source_files]
+        for group in find_duplicates(candidates + existing_files, hash_index, workers, source_paths):
+            # Keep a copy that's already organized if there is one, else the first by name
+            keep = sorted(group, key=lambda path: (path in source_paths, path))[0]
+            for path in group:
+                if path != keep and path in source_paths:
+                    duplicate_of[path] = keep
+
+    # Normal moves first, so kept copies are planned before their duplicates
+    duplicates = []
+    for item, item_path, size, _ in source_files:
+        category_folder = resolver.resolve(item, item_path)
+        if item_path in duplicate_of:
+            duplicates.append((item, item_path, size, category_folder))
+            continue
+        plan.add(item_path, category_folder, os.path.join(source_dir, category_folder),
+                 resolver.split_name(item), size, 'move')
+
+    for item, item_path, size, category_folder in sorted(duplicates, key=lambda d: d[1]):
+        keep_path = duplicate_of[item_path]
+        if dedup == 'skip':
+            plan.add(item_path, category_folder, None, None, size, 'skip', keep_path)
+        elif dedup == 'move':
+            plan.add(item_path, DUPLICATES_FOLDER, os.path.join(source_dir, DUPLICATES_FOLDER),
+                     resolver.split_name(item), size, 'duplicate', keep_path)
+        else:
+            plan.add(item_path, category_folder, os.path.join(source_dir, category_folder),
+                     resolver.split_name(item), size, 'hardlink', keep_path)
+    return plan, hash_index
+
+
+def execute_plan(plan, workers=DEFAULT_MOVE_WORKERS, copy_workers=DEFAULT_COPY_WORKERS, verbose=True):
+    """
+    Carries out a MovePlan:
+      1. creates each destination folder once
+      2. runs same-drive renames on `workers` threads and cross-drive copies on
+         `copy_workers` threads at the same time
+      3. then handles duplicates (hard links need the kept copy's final path)
+    Returns a list of (move, new_path, error) for every move that was attempted.
+    """
+    for folder in {os.path.dirname(move['destination']) for move in plan.moves if move['destination']}:
+        os.makedirs(folder, exist_ok=True)
+
+    results = []
+    final_paths = {}  # source path -> where it really ended up
+
+    def report(move, new_path, error):
+        results.append((move, new_path, error))
+        item = os.path.basename(move['source'])
+        if error:
+            print(f"Error moving {item}: {error}")
+            return
+        final_paths[move['source']] = new_path
+        if not verbose:
+            return
+        if move['action'] in ('hardlink', 'duplicate'):
+            print(f"Duplicate: {move['action']} **{item}** -> **{new_path}** "
+                  f"(same content as {move['duplicate_of']})")
+        elif os.path.basename(new_path) != item:
+            print(f'Conflict: Renamed and moved **{item}** to **{new_path}**')
+        else:
+            print(f"Moved: **{item}** to **{move['category']}/**")
+
+    moves = [move for move in plan.moves if move['action'] == 'move']
+    with ThreadPoolExecutor(max_workers=workers) as rename_pool, \
+            ThreadPoolExecutor(max_workers=copy_workers) as copy_pool:
+        futures = {}
+        for move in moves:
+            pool = copy_pool if move['cross_device'] else rename_pool
+            futures[pool.submit(perform_move, plan.name_index, move)] = move
+        for future in as_completed(futures):
+            report(futures[future], *future.result())
+
+    for move in plan.moves:
+        if move['action'] == 'skip':
+            if verbose:
+                print(f"Duplicate: Skipped **{os.path.basename(move['source'])}** "
+                      f"(same content as {move['duplicate_of']})")
+        elif move['action'] != 'move':
+            link_to = None
+            if move['action'] == 'hardlink':
+                link_to = final_paths.get(move['duplicate_of'], move['duplicate_of'])
+            report(move, *perform_move(plan.name_index, move, link_to))
+    return results
+
+
+def organize_files_fast(source_dir, workers=DEFAULT_MOVE_WORKERS, verbose=True, resolver=None, dedup=None,
+                        recursive=False, incremental=False, paths=None, dry_run=False, plan_path=None,
+                        copy_workers=DEFAULT_COPY_WORKERS):
+    """
+    Same result as organize_files, built for folders with 100k+ files:
+
+    1. os.scandir lists the folder ONCE; entry.is_dir() reuses the file type the
+       operating system already returned, so there is no extra stat per file
+       (only folder shortcuts/symlinks need one).
+    2. A MovePlan is built first: every destination is picked (duplicate names are
+       resolved from an in-memory index of each category folder) and moves to another
+       drive are detected. dry_run=True stops here and prints the plan;
+       plan_path saves it as JSON for review.
+    3. Each destination folder is created once, not once per file.
+    4. Every destination is claimed with exclusive-create, so two files with the same
+       name can never race for the same destination.
+    5. Same-drive moves are a single rename on a thread pool; moves to another drive
+       are chunked copies on a small separate pool (copy_workers).
+
+    dedup controls what happens to files whose CONTENT is identical to another file
+    (in the folder or already in a category folder):
+      None       - keep every copy (duplicates of a name are renamed, as before)
+      'skip'     - leave the extra copies where they are
+      'hardlink' - organize the extra copies as hard links to the kept copy (saves space)
+      'move'     - move the extra copies into the Duplicates folder
+
+    recursive=True also collects files from sub-folders (but never from the category folders).
+    incremental=True records every processed file in a manifest (so the run can be undone)
+    and skips folders that haven't changed since the last run.
+    paths: organize ONLY these files instead of scanning (used by the watch daemon).
+
+    Returns a dict with counts, the files/sec rate and 'failed' (the source paths
+    whose move raised an error).
+    """
+    resolver = resolver or DEFAULT_RESOLVER
+    mode = "DRY RUN of" if dry_run else "FAST"
+    print(f"--- Starting {mode} organization in: {source_dir} ({workers} move threads) ---")
+    stats = {'moved': 0, 'renamed': 0, 'duplicates': 0, 'errors': 0, 'failed': [], 'unchanged_folders': 0,
+             'seconds': 0.0, 'files_per_second': 0.0}
+
+    if not os.path.exists(source_dir):
+        print(f"Error: Source directory not found at {source_dir}")
+        return stats
+
+    start_time = time.perf_counter()
+    manifest = OrganizerManifest(source_dir) if incremental and not dry_run else None
+    output_folders = set(resolver.index.values()) | {DEFAULT_CATEGORY, DUPLICATES_FOLDER}
+
+    # 1. List the folder(s) once, skipping our own category folders
+    if paths is not None:
+        # The caller already knows which files are new: just check they're still there
+        source_files, listed_dirs = stat_files(paths), {}
+    else:
+        previous_dirs = OrganizerManifest(source_dir).load_state() if incremental else {}
+        source_files, listed_dirs = scan_source_files(source_dir, output_folders, recursive, previous_dirs,
+                                                      need_stat=bool(dedup or incremental))
+    stats['unchanged_folders'] = len(listed_dirs) - sum(1 for state in listed_dirs.values() if state['listed'])
+    file_info = {path: (size, mtime_ns) for _, path, size, mtime_ns in source_files}
+
+    # 2. Plan everything before touching anything
+    plan, hash_index = build_move_plan(source_dir, source_files, resolver, dedup, workers, output_folders)
+    if plan_path:
+        plan.export_json(plan_path)
+        print(f"--- Plan saved to: {plan_path} ---")
+    if dry_run:
+        plan.print_plan(verbose)  # A dry run writes nothing, not even the hash cache
+        summary = plan.summary()
+        stats.update(moved=0, renamed=summary['renamed'], duplicates=summary['duplicates'])
+        stats['seconds'] = time.perf_counter() - start_time
+        return stats
+
+    # 3-5. Carry the plan out
+    results = execute_plan(plan, workers, copy_workers, verbose)
+
+    manifest_records = []
+    failed_dirs = set()  # folders to list again next time because something went wrong
+    kept_in_place = {}   # folder -> {name: [size, mtime_ns]} for files deliberately left alone
+    for move, new_path, error in results:
+        if error:
+            stats['errors'] += 1
+            stats['failed'].append(move['source'])
+            failed_dirs.add(os.path.dirname(move['source']))
+            continue
+        if move['action'] == 'move':
+            stats['moved'] += 1
+            if os.path.basename(new_path) != os.path.basename(move['source']):
+                stats['renamed'] += 1
+        else:
+            stats['duplicates'] += 1
+        if hash_index:
+            hash_index.rename(move['source'], new_path)
+        if manifest:
+            manifest_records.append(manifest.make_record(move['source'], file_info[move['source']],
+                                                         new_path, move['action']))
+    for move in plan.moves:
+        if move['action'] == 'skip':
+            stats['duplicates'] += 1
+            kept_in_place.setdefault(os.path.dirname(move['source']), {})[
+                os.path.basename(move['source'])] = list(file_info[move['source']])
+            if manifest:
+                manifest_records.append(manifest.make_record(move['source'], file_info[move['source']],
+                                                             None, 'skipped'))
+
+    if hash_index:
+        hash_index.save()
+
+    # Incremental mode: log what happened and remember each folder's state for next time
+    if manifest:
+        manifest.append(manifest_records)
+        if paths is None:
+            manifest.save_state(listed_dirs, kept_in_place, failed_dirs)
+
+    stats['seconds'] = time.perf_counter() - start_time
+    if stats['seconds'] > 0:
+        stats['files_per_second'] = stats['moved'] / stats['seconds']
+    print(f"--- Organization complete! {stats['moved']} files moved in {stats['seconds']:.2f}s "
+          f"({stats['files_per_second']:.0f} files/sec, {stats['renamed']} renamed, "
+          f"{stats['duplicates']} duplicates, {stats['errors']} errors) ---")
+    if manifest:
+        print(f"--- Incremental: {stats['unchanged_folders']} unchanged folders skipped, "
+              f"{len(manifest_records)} entries added to {MANIFEST_FILE} ---")
+    return stats
+
+
+# --- WATCH DAEMON: react to new files instead of rescanning on a timer ---
+
+class FolderWatcher:
+    """
+    Cheap polling watcher built on os.stat / os.scandir (works everywhere, no extra packages).
+
+    - While nothing happens, each poll costs ONE stat per watched folder: a folder's
+      modification time only changes when a file is added, removed or renamed in it.
+    - Only a folder that changed is listed again with os.scandir.
+    - New files are "debounced": a file is only handed over once its size and
+      modification time have stayed the same for `settle_seconds`, so a download
+      or copy that's still being written is never moved half-way.
+    - A file stays pending until done() reports it was organized; a file whose move
+      failed (locked, or still open in another program) is retried after settling again.
+    """
+
+    def __init__(self, source_dir, output_folders, recursive=False, settle_seconds=DEFAULT_SETTLE_SECONDS):
+        self.source_dir = source_dir
+        self.output_folders = output_folders
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+        self.dir_mtimes = {}  # folder -> mtime_ns when we last listed it
+        self.pending = {}     # file path -> (size, mtime_ns, time it last changed)
+        self.handled = {}     # folder -> {file path: (size, mtime_ns)} already handed over
+
+    def _list_folder(self, dir_path):
+        """Lists one changed folder: remembers new files as pending, finds sub-folders."""
+        subdirs = []
+        handled = self.handled.get(dir_path, {})
+        still_here = {}
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if (self.recursive and not entry.is_symlink() and
+                                not (dir_path == self.source_dir and entry.name in self.output_folders)):
+                            subdirs.append(entry.path)
+                        continue
+                    if (entry.name.startswith(INTERNAL_FILE_PREFIX) or entry.path in self.pending or
+                            entry.name.lower().endswith(PARTIAL_DOWNLOAD_EXTENSIONS)):
+                        continue
+                    info = entry.stat(follow_symlinks=False)
+                    # Handed over before and left here (e.g. a skipped duplicate): ignore it
+                    if handled.get(entry.path) == (info.st_size, info.st_mtime_ns):
+                        still_here[entry.path] = handled[entry.path]
+                        continue
+                    self.pending[entry.path] = (info.st_size, info.st_mtime_ns, time.monotonic())
+        except OSError:
+            pass  # Folder vanished between the stat and the listing
+        # Forget handled files that have gone (moved away), so this never grows without limit
+        self.handled[dir_path] = still_here
+        return subdirs
+
+    def poll(self):
+        """Checks for changes once. Returns the list of files that are ready to organize."""
+        # 1. Stat every known folder; list only the ones whose mtime changed
+        folders = [self.source_dir] + [path for path in self.dir_mtimes if path != self.source_dir]
+        while folders:
+            dir_path = folders.pop()
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                self.dir_mtimes.pop(dir_path, None)
+                continue
+            if self.dir_mtimes.get(dir_path) == mtime_ns:
+                continue
+            self.dir_mtimes[dir_path] = mtime_ns
+            for subdir in self._list_folder(dir_path):
+                if subdir not in self.dir_mtimes:
+                    folders.append(subdir)
+
+        # 2. Debounce: only files that stopped changing at least settle_seconds ago are ready
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime_ns, changed_at) in list(self.pending.items()):
+            try:
+                info = os.stat(path)
+            except OSError:
+                del self.pending[path]  # Deleted or renamed before we got to it
+                continue
+            if (info.st_size, info.st_mtime_ns) != (size, mtime_ns):
+                self.pending[path] = (info.st_size, info.st_mtime_ns, now)  # Still being written
+            elif now - changed_at >= self.settle_seconds:
+                ready.append(path)
+        return ready
+
+    def done(self, paths, failed=()):
+        """Called with the files poll() returned once they've been organized."""
+        now = time.monotonic()
+        failed = set(failed)
+        for path in paths:
+            size, mtime_ns, _ = self.pending.pop(path)
+            if path in failed:
+                self.pending[path] = (size, mtime_ns, now)  # Try again once it has settled again
+            else:
+                self.handled.setdefault(os.path.dirname(path), {})[path] = (size, mtime_ns)
+
+
+def watch_folder(source_dir, interval=DEFAULT_POLL_INTERVAL, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 stop_event=None, resolver=None, recursive=False, **organize_options):
+    """
+    Daemon mode: keeps watching source_dir and organizes new files in batches
+    as soon as they have finished being written. Stop it with Ctrl+C (or stop_event.set()).
+    Files that are already in the folder when the watch starts are organized first.
+    organize_options are passed on to organize_files_fast (workers, dedup, ...).
+    """
+    resolver = resolver or DEFAULT_RESOLVER
+    output_folders = set(resolver.index.values()) | {DEFAULT_CATEGORY, DUPLICATES_FOLDER}
+    watcher = FolderWatcher(source_dir, output_folders, recursive, settle_seconds)
+    stop_event = stop_event or threading.Event()
+    print(f"--- Watching {source_dir} (poll every {interval}s, files must be idle for {settle_seconds}s) ---")
+
+    batches = 0
+    try:
+        while not stop_event.is_set():
+            ready = watcher.poll()
+            if ready:
+                # Everything that settled since the last poll is moved as ONE batch
+                batches += 1
+                stats = organize_files_fast(source_dir, resolver=resolver, paths=ready, **organize_options)
+                watcher.done(ready, stats['failed'])
+            # Sleeping (not spinning) keeps idle CPU near zero; the event lets us stop early
+            stop_event.wait(interval)
+    except KeyboardInterrupt:
+        print("\n--- Watch stopped by user ---")
+    return batches
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Sort the files in a folder into category sub-folders.")
+    parser.add_argument("source_dir", nargs="?", default=SOURCE_DIR,
+                        help="Folder to organize (default: SOURCE_DIR at the top of this file)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MOVE_WORKERS,
+                        help=f"Number of parallel move threads (default: {DEFAULT_MOVE_WORKERS})")
+    parser.add_argument("--quiet", action="store_true", help="Only print errors and the final summary")
+    parser.add_argument("--rules", metavar="JSON_FILE",
+                        help='Extra category rules, e.g. {"Music": [".mp3", ".flac"]}')
+    parser.add_argument("--sniff", action="store_true",
+                        help="Identify files with unknown extensions from their first bytes")
+    parser.add_argument("--dedup", choices=DEDUP_MODES,
+                        help="What to do with files whose content matches another file")
+    parser.add_argument("--recursive", action="store_true",
+                        help="Also organize files inside sub-folders")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Record moves in {MANIFEST_FILE} and skip folders unchanged since the last run")
+    parser.add_argument("--undo", action="store_true",
+                        help="Move the files of the last incremental run back where they came from")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and organize new files as they appear (Ctrl+C to stop)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Watch mode: seconds between checks (default: {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help=f"Watch mode: seconds a file must stay unchanged (default: {DEFAULT_SETTLE_SECONDS})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only show what would be moved (nothing is changed)")
+    parser.add_argument("--plan-json", metavar="PATH",
+                        help="Save the full move plan as JSON for review")
+    parser.add_argument("--copy-workers", type=int, default=DEFAULT_COPY_WORKERS,
+                        help=f"Parallel copies for moves to another drive (default: {DEFAULT_COPY_WORKERS})")
+    parser.add_argument("--simple", action="store_true",
+                        help="Use the original one-file-at-a-time organize_files instead")
+    args = parser.parse_args()
+    if (args.dry_run or args.plan_json) and (args.undo or args.simple):
+        # Neither path plans its moves first, so there is nothing to show without doing it
+        parser.error("--dry-run and --plan-json can't be combined with --undo or --simple")
+
     # It's good practice to print the target directory before running
-    print(f"Attempting to organize: {SOURCE_DIR}")
-    organize_files(SOURCE_DIR)
+    print(f"Attempting to organize: {args.source_dir}")
+    if args.undo:
+        OrganizerManifest(args.source_dir).undo_last_run(verbose=not args.quiet)
+    elif args.simple:
+        organize_files(args.source_dir)
+    else:
+        extra_rules = load_category_rules(args.rules) if args.rules else None
+        resolver = CategoryResolver(extra_rules=extra_rules, sniff=args.sniff)
+        if args.watch:
+            watch_folder(args.source_dir, interval=args.interval, settle_seconds=args.settle, resolver=resolver,
+                         recursive=args.recursive, workers=args.workers, verbose=not args.quiet,
+                         dedup=args.dedup, incremental=args.incremental, copy_workers=args.copy_workers,
+                         dry_run=args.dry_run, plan_path=args.plan_json)
+        else:
+            organize_files_fast(args.source_dir, workers=args.workers, verbose=not args.quiet,
+                                resolver=resolver, dedup=args.dedup, recursive=args.recursive,
+                                incremental=args.incremental, dry_run=args.dry_run,
+                                plan_path=args.plan_json, copy_workers=args.copy_workers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,259 @@
+# Lint Runner: lints every .py file under a directory, in parallel, with a result cache.
+#
+# - Files are found with os.scandir (skipping .git, virtualenvs, __pycache__ ...).
+# - Each file is hashed; if (content hash, rule-set fingerprint) is already in the
+#   cache, the stored result is reused and the file is not linted again.
+# - Only the changed files go to a process pool (tokenizing is CPU work, so
+#   processes, not threads, spread it over all the cores).
+# - Results can be printed as text, JSON, or SARIF (the format CI systems and
+#   code-review tools understand).
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lint_engine import (LintEngine, LintResult, Diagnostic, describe_rule, format_profile,
+                         load_plugins, merge_profile_stats)
+
+# --- 1. Settings ---
+DEFAULT_CACHE_FILE = ".lint_cache.json"
+SKIPPED_DIRECTORIES = {".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "env",
+                       "node_modules", ".tox", ".nox", ".mypy_cache", ".pytest_cache", "build", "dist"}
+FILES_PER_TASK = 32  # Files sent to a worker process at once (fewer, bigger messages)
+
+
+# --- 2. File Discovery ---
+def discover_python_files(root):
+    """Returns every .py file under `root` (or `root` itself if it is a file), sorted."""
+    if os.path.isfile(root):
+        return [root]
+    found = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_DIRECTORIES and not entry.name.endswith(".egg-info"):
+                        pending.append(entry.path)
+                elif entry.name.endswith(".py") and entry.is_file():
+                    found.append(entry.path)
+    return sorted(found)
+
+
+# --- 3. Result Cache ---
+class LintCache:
+    """
+    Remembers lint results between runs in one JSON file:
+        {"fingerprint": <rule set>, "results": {<sha256 of file content>: [diagnostics]}}
+    Keyed by CONTENT, so a renamed or copied file is still a cache hit. A different
+    rule set (new version, other settings) has another fingerprint and starts empty.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.results = {}
+        self.used = set()  # Hashes looked up this run (everything else is pruned on save)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("fingerprint") == fingerprint:
+                    self.results = stored.get("results", {})
+            except (OSError, json.JSONDecodeError):
+                pass  # A broken cache is just an empty cache
+
+    def get(self, content_hash):
+        self.used.add(content_hash)
+        return self.results.get(content_hash)
+
+    def put(self, content_hash, diagnostics):
+        self.used.add(content_hash)
+        self.results[content_hash] = diagnostics
+
+    def save(self):
+        """Writes the cache atomically, keeping only entries for files that still exist."""
+        if not self.path:
+            return
+        kept = {key: value for key, value in self.results.items() if key in self.used}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "results": kept}, f)
+        os.replace(temp_path, self.path)
+
+
+# --- 4. Worker Process ---
+_worker_engine = None
+
+
+def init_lint_worker(engine_options, plugins=()):
+    """Runs once per worker process: load plugins and build the engine (and its rules) only once."""
+    global _worker_engine
+    load_plugins(plugins)
+    _worker_engine = LintEngine(**engine_options)
+
+
+def lint_paths(paths):
+    """
+    Lints a batch of files inside a worker. Returns ([(path, [diagnostic dicts])], profile)
+    where profile is the time per rule spent on THIS batch (empty unless profiling).
+    """
+    results = []
+    for stats in _worker_engine.profile_stats.values():
+        stats["calls"], stats["seconds"] = 0, 0.0
+    for path in paths:
+        with open(path, "rb") as f:
+            result = _worker_engine.lint_bytes(f.read(), path)
+        results.append((path, [d.to_dict() for d in result.diagnostics]))
+    profile = _worker_engine.profile_stats if _worker_engine.profile else {}
+    return results, profile
+
+
+# --- 5. The Runner ---
+def run_lint(paths, workers=None, cache_path=DEFAULT_CACHE_FILE, indent_size=4,
+             select=None, ignore=None, plugins=(), profile=False):
+    """
+    Lints every .py file under `paths`. Returns (results, stats) where results is
+    a list of LintResult (sorted by path) and stats counts files, cache hits and
+    time (plus "profile": time per rule, when profile=True).
+    Profiling measures real lint work, so it ignores cached results.
+    """
+    start = time.perf_counter()
+    load_plugins(plugins)
+    engine_options = {"indent_size": indent_size, "select": select, "ignore": ignore, "profile": profile}
+    engine = LintEngine(**engine_options)
+    cache = LintCache(None if profile else cache_path, engine.fingerprint())
+
+    files = sorted({path for root in paths for path in discover_python_files(root)})
+    diagnostics_by_path = {}
+    hash_of = {}
+    to_lint = []
+    for path in files:
+        with open(path, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        hash_of[path] = content_hash
+        cached = cache.get(content_hash)
+        if cached is None:
+            to_lint.append(path)
+        else:
+            diagnostics_by_path[path] = cached
+
+    # Small jobs aren't worth starting processes for
+    batches = [to_lint[i:i + FILES_PER_TASK] for i in range(0, len(to_lint), FILES_PER_TASK)]
+    if len(batches) <= 1 or workers == 1:
+        init_lint_worker(engine_options)
+        batch_results = map(lint_paths, batches)
+        linted, profile_stats = _collect(batch_results)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_lint_worker,
+                                 initargs=(engine_options, tuple(plugins))) as executor:
+            linted, profile_stats = _collect(executor.map(lint_paths, batches))
+
+    for path, diagnostics in linted:
+        diagnostics_by_path[path] = diagnostics
+        cache.put(hash_of[path], diagnostics)
+    cache.save()
+
+    results = [LintResult(path, [Diagnostic(**d) for d in diagnostics_by_path[path]]) for path in files]
+    stats = {"files": len(files), "linted": len(to_lint), "cached": len(files) - len(to_lint),
+             "seconds": time.perf_counter() - start}
+    if profile:
+        stats["profile"] = profile_stats
+        stats["rule_names"] = {rule.code: rule.name for rule in engine.rules}
+    return results, stats
+
+
+def _collect(batch_results):
+    """Joins the per-batch results and adds up their profiles."""
+    linted, profile_stats = [], {}
+    for batch, profile in batch_results:
+        linted.extend(batch)
+        merge_profile_stats(profile_stats, profile)
+    return linted, profile_stats
+
+
+# --- 6. Output Formats ---
+def to_json(results):
+    return json.dumps([result.to_dict() for result in results if result.diagnostics], indent=2)
+
+
+def to_sarif(results, rules):
+    """SARIF 2.1.0: the standard JSON format for static-analysis results."""
+    sarif_results = []
+    for result in results:
+        for d in result.diagnostics:
+            sarif_results.append({
+                "ruleId": d.code,
+                "level": "error" if d.severity == "error" else "warning",
+                "message": {"text": d.message},
+                "locations": [{"physicalLocation": {
+                    "artifactLocation": {"uri": result.path.replace(os.sep, "/")},
+                    "region": {"startLine": d.line, "startColumn": d.column},
+                }}],
+            })
+    rule_descriptions = [{"id": rule.code, "name": rule.name,
+                          "shortDescription": {"text": describe_rule(rule)}}
+                         for rule in rules]
+    return json.dumps({
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{"tool": {"driver": {"name": "lint_engine", "rules": rule_descriptions}},
+                  "results": sarif_results}],
+    }, indent=2)
+
+
+def to_text(results):
+    return "\n".join(result.format_report() for result in results if result.diagnostics)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Lint every Python file under the given paths, in parallel, with a result cache.",
+        epilog="Example: python lint_runner.py . --format sarif --output lint.sarif"
+    )
+    parser.add_argument("paths", nargs="*", default=["."], help="Files or directories to lint (default: .)")
+    parser.add_argument("--format", choices=["text", "json", "sarif"], default="text", help="Output format")
+    parser.add_argument("--output", help="Write the report to this file instead of the screen")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE,
+                        help=f"Result cache file (default: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Lint every file, without reading or writing the cache")
+    parser.add_argument("--indent-size", type=int, default=4, help="Expected indentation width (default: 4)")
+    parser.add_argument("--select", nargs="+", help="Only run these rules (codes, code prefixes or names)")
+    parser.add_argument("--ignore", nargs="+", help="Skip these rules (codes, code prefixes or names)")
+    parser.add_argument("--plugin", nargs="+", default=[], help="Import these modules to register extra rules")
+    parser.add_argument("--profile", action="store_true",
+                        help="Lint every file (no cache) and report the time spent in each rule")
+    args = parser.parse_args()
+
+    results, stats = run_lint(args.paths, workers=args.workers,
+                              cache_path=None if args.no_cache else args.cache, indent_size=args.indent_size,
+                              select=args.select, ignore=args.ignore, plugins=args.plugin, profile=args.profile)
+
+    if args.format == "json":
+        report = to_json(results)
+    elif args.format == "sarif":
+        report = to_sarif(results, LintEngine(indent_size=args.indent_size, select=args.select,
+                                              ignore=args.ignore).rules)
+    else:
+        report = to_text(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    elif report:
+        print(report)
+
+    if args.profile:
+        print("\n--- Rule Profile (all workers) ---", file=sys.stderr)
+        print(format_profile(stats["profile"], stats["rule_names"]), file=sys.stderr)
+
+    problems = sum(len(result.diagnostics) for result in results)
+    print(f"\n{stats['files']} files ({stats['cached']} from cache, {stats['linted']} linted), "
+          f"{problems} problems, {stats['seconds']:.2f}s", file=sys.stderr)
+    sys.exit(1 if any(result.errors for result in results) else 0)
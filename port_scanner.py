@@ -2,6 +2,12 @@ import socket
 import threading
 import time
 import sys 
+import os
+import csv
+import json
+import argparse
+import itertools
+from db_manager import DatabaseManager
 
 # --- 1. Configuration (Set defaults, these will be overwritten by user input) ---
 TARGET_HOST = '127.0.0.1'  
@@ -9,9 +15,11 @@ PORT_RANGE_START = 1
 PORT_RANGE_END = 100      
 TIMEOUT = 0.5             
 
-# List to store open ports found: now stores (port, service) tuples
-open_ports = [] 
-print_lock = threading.Lock() 
+# Open ports found are now collected by the ScanResultSink below (as (port, service) tuples)
+
+# How often the resume state file is rewritten (whichever comes first)
+CHECKPOINT_EVERY_PORTS = 500
+CHECKPOINT_EVERY_SECONDS = 5.0
 
 # Heuristic mapping for common port services
 KNOWN_PORTS = {
@@ -29,12 +37,204 @@ KNOWN_PORTS = {
     3389: 'RDP (Remote Desktop)'
 }
 
-# --- 2. The Concurrent Worker Function (I/O Bound Task) ---
-def port_scan_worker(port):
+# --- 2. The Results Sink (Streaming Output + Resume State) ---
+def compress_port_ranges(ports):
+    """Turns a set of port numbers into sorted [start, end] ranges, e.g. {1,2,3,7} -> [[1,3],[7,7]]."""
+    ranges = []
+    for port in sorted(ports):
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ranges
+
+
+def load_scan_state(state_path):
+    """
+    Reads a checkpoint file written by ScanResultSink.
+    Returns a dict mapping host -> set of ports that were already scanned.
+    """
+    if not state_path or not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read state file {state_path}: {e}")
+        return {}
+
+    completed = {}
+    for host, ranges in state.get('completed', {}).items():
+        ports = set()
+        for start, end in ranges:
+            ports.update(range(start, end + 1))
+        completed[host] = ports
+    return completed
+
+
+def load_previous_results(output_path, output_format):
+    """Reads the open ports already streamed to an output file by an earlier (interrupted) run."""
+    results = []
+    if not output_path or not os.path.exists(output_path):
+        return results
+
+    with open(output_path, 'r', newline='', encoding='utf-8') as f:
+        if output_format == 'csv':
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            results.append((row['host'], int(row['port']), row['service']))
+    return results
+
+
+class ScanResultSink:
+    """
+    Collects scan results as workers finish, instead of only at the end of the scan.
+
+    - Every OPEN port is written straight away to a JSON Lines (.jsonl) or CSV file,
+      so an interrupted scan still keeps everything it found.
+    - Every FINISHED port (open or closed) is remembered, and the finished ranges are
+      checkpointed to a small JSON state file so `--resume` can skip them next time.
+
+    Closed ports (almost all of them) never take a lock: marking one finished is a
+    single set.add. Only OPEN ports lock, to write and print their line in one piece,
+    and the state file is written outside that lock from a copy of the finished ports.
+    """
+
+    def __init__(self, output_path=None, output_format='jsonl', state_path=None,
+                 checkpoint_every=CHECKPOINT_EVERY_PORTS,
+                 checkpoint_interval=CHECKPOINT_EVERY_SECONDS,
+                 completed=None, open_ports=None, quiet=False, resume=False):
+        self.output_format = output_format
+        self.state_path = state_path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.quiet = quiet
+        self.lock = threading.Lock()              # Open ports: output file, open_ports, printing
+        self._checkpoint_lock = threading.Lock()  # One state file write at a time
+
+        # host -> set of finished ports (seeded from the state file when resuming)
+        self.completed = {host: set(ports) for host, ports in (completed or {}).items()}
+        # (port, service) tuples, seeded with earlier results when resuming
+        self.open_ports = list(open_ports or [])
+        # next() on itertools.count is one C call, so it counts correctly without a lock
+        self._finished_count = itertools.count(1)
+        self._last_checkpoint = time.perf_counter()
+
+        self._file = None
+        self._writer = None
+        self._closed = False
+        if output_path:
+            # A resumed scan appends to the results of the earlier run; a new scan starts over
+            is_new_file = not resume or not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+            self._file = open(output_path, 'a' if resume else 'w', newline='', encoding='utf-8')
+            if output_format == 'csv':
+                self._writer = csv.writer(self._file)
+                if is_new_file:
+                    self._writer.writerow(['host', 'port', 'service', 'timestamp'])
+
+    def is_done(self, host, port):
+        """True if this (host, port) was already scanned by a previous run."""
+        return port in self.completed.get(host, ())
+
+    def record(self, host, port, service_name=None):
+        """
+        Marks (host, port) as finished. Pass a service_name only when the port is OPEN.
+        Calls after close() are ignored: the port stays unfinished, so --resume scans it again.
+        """
+        if self._closed:
+            return
+        if service_name is not None:
+            with self.lock:
+                if self._closed:
+                    return
+                self.open_ports.append((port, service_name))
+                self._write_result(host, port, service_name)
+                # Marked finished only once its line is written, so --resume can't lose it
+                self._finished_ports(host).add(port)
+                if not self.quiet:
+                    print(f"✅ Port {port:<5} is OPEN ({service_name})")
+        else:
+            # set.add is a single operation under the GIL: no lock needed
+            self._finished_ports(host).add(port)
+
+        if (next(self._finished_count) % self.checkpoint_every == 0 or
+                time.perf_counter() - self._last_checkpoint >= self.checkpoint_interval):
+            self._checkpoint()
+
+    def _finished_ports(self, host):
+        ports = self.completed.get(host)
+        if ports is None:
+            ports = self.completed.setdefault(host, set())  # Atomic: racing threads get the same set
+        return ports
+
+    def _write_result(self, host, port, service_name):
+        """Streams one open port to the output file (caller holds the lock)."""
+        if not self._file:
+            return
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        if self._writer:
+            self._writer.writerow([host, port, service_name, timestamp])
+        else:
+            record = {'host': host, 'port': port, 'service': service_name, 'timestamp': timestamp}
+            self._file.write(json.dumps(record) + '\n')
+        # Flush so the result survives a crash or Ctrl+C
+        self._file.flush()
+
+    def _checkpoint(self, final=False):
+        """
+        Writes finished port ranges to the state file. Workers skip the write if another
+        thread is already doing one; only close() waits, and nothing is written after it.
+        """
+        if not self._checkpoint_lock.acquire(blocking=final):
+            return
+        try:
+            if self._closed and not final:
+                return
+            self._last_checkpoint = time.perf_counter()
+            if not self.state_path:
+                return
+            # Copy first (set() of a set is one operation under the GIL), then sort and write
+            finished = {host: set(ports) for host, ports in list(self.completed.items())}
+            state = {
+                'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'completed': {host: compress_port_ranges(ports) for host, ports in finished.items()},
+            }
+            # Write to a temporary file first, then swap it in, so a crash never leaves half a file
+            temp_path = self.state_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+        finally:
+            self._checkpoint_lock.release()
+
+    def close(self):
+        """Closes the output file and writes a final checkpoint. Later record() calls are ignored."""
+        with self.lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._file:
+                self._file.close()
+                self._file = None
+        self._checkpoint(final=True)
+
+
+# Default sink: no files, just prints (matches the original behaviour)
+result_sink = ScanResultSink()
+
+
+# --- 3. The Concurrent Worker Function (I/O Bound Task) ---
+def port_scan_worker(port, sink=None):
     """
     Attempts to connect to a specific port and detect the service running.
+    The outcome is handed to the results sink, which streams and checkpoints it.
     """
     global TARGET_HOST
+    sink = sink or result_sink
+    # Stays None unless the port turns out to be open
+    found_service = None
     
     # Create a socket object
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -66,13 +266,7 @@ def port_scan_worker(port):
                     # Fallback if reading the banner fails
                     service_name = "Open (Silent Service)"
             
-            # Use the lock to safely update the shared list
-            with print_lock:
-                open_ports.append((port, service_name))
-
-            # Use the lock to ensure the print statement doesn't get interrupted
-            with print_lock:
-                print(f"✅ Port {port:<5} is OPEN ({service_name})")
+            found_service = service_name
             
     except socket.error:
         # We silently ignore common connection errors (connection refused, etc.)
@@ -82,19 +276,32 @@ def port_scan_worker(port):
         # Always close the socket
         sock.close()
 
-# --- 3. Main Execution and Thread Management ---
+    # The sink marks the port finished (and streams and prints it, if open)
+    sink.record(TARGET_HOST, port, found_service)
+
+# --- 4. Main Execution and Thread Management ---
 if __name__ == "__main__":
     
-    # --- ARGUMENT HANDLING BLOCK (Unchanged) ---
-    if len(sys.argv) != 3:
-        print("Usage: python port_scanner.py <target_host_ip> <end_port>")
-        print("Example: python port_scanner.py 127.0.0.1 500")
-        sys.exit(1)
+    # --- ARGUMENT HANDLING BLOCK ---
+    parser = argparse.ArgumentParser(
+        description="Concurrent TCP port scanner.",
+        epilog="Example: python port_scanner.py 127.0.0.1 500 --output scan.jsonl --resume"
+    )
+    parser.add_argument("target_host", help="Target host IP address")
+    parser.add_argument("end_port", help="Last port to scan (1-65535)")
+    parser.add_argument("--output", help="Stream open ports to this file as they are found (.jsonl or .csv)")
+    parser.add_argument("--format", choices=['jsonl', 'csv'],
+                        help="Output format (default: guessed from the --output file extension)")
+    parser.add_argument("--state", help="Checkpoint file for finished ports (default: <output>.state.json)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip ports already finished according to the state file")
+    parser.add_argument("--db", help="Save results to this security_log database and show changes since the last run")
+    args = parser.parse_args()
         
-    TARGET_HOST = sys.argv[1] 
+    TARGET_HOST = args.target_host 
     
     try:
-        PORT_RANGE_END = int(sys.argv[2]) 
+        PORT_RANGE_END = int(args.end_port) 
         if PORT_RANGE_END > 65535 or PORT_RANGE_END < 1:
             print("Error: End port must be between 1 and 65535.")
             sys.exit(1)
@@ -102,8 +309,34 @@ if __name__ == "__main__":
     except ValueError:
         print("Error: Port range end must be a valid number.")
         sys.exit(1)
+
+    output_format = args.format or ('csv' if args.output and args.output.lower().endswith('.csv') else 'jsonl')
+    state_path = args.state or (args.output + '.state.json' if args.output else None)
+    if args.resume and not state_path:
+        print("Error: --resume needs a --state file (or an --output file to derive it from).")
+        sys.exit(1)
     # --- END ARGUMENT HANDLING BLOCK ---
 
+    # When resuming, reload finished ports and the open ports already written to disk
+    completed = {}
+    previous_open_ports = []
+    if args.resume:
+        completed = load_scan_state(state_path)
+        for host, port, service in load_previous_results(args.output, output_format):
+            if host == TARGET_HOST:
+                previous_open_ports.append((port, service))
+    result_sink = ScanResultSink(args.output, output_format, state_path,
+                                 completed=completed, open_ports=previous_open_ports, resume=args.resume)
+
+    # Register the scan run up front; results are bulk-saved in one transaction at the end
+    db_manager = None
+    if args.db:
+        db_manager = DatabaseManager(args.db)
+        db_manager.connect()
+        db_manager.create_table()
+        db_manager.create_scan_tables()
+        scan_run_id = db_manager.start_scan_run(TARGET_HOST, PORT_RANGE_START, PORT_RANGE_END)
+
     
     print("=" * 40)
     print(f"Starting CONCURRENT Port Scanner")
@@ -114,27 +347,40 @@ if __name__ == "__main__":
     start_time = time.time()
     
     threads = []
+    skipped = 0
     
     # Loop through the now-dynamic port range
-    for port in range(PORT_RANGE_START, PORT_RANGE_END + 1):
-        thread = threading.Thread(target=port_scan_worker, args=(port,))
-        threads.append(thread)
-        thread.start()
-        
-    print("\n--- Main program waiting for all threads to finish scanning... ---")
-    for thread in threads:
-        thread.join()
+    try:
+        for port in range(PORT_RANGE_START, PORT_RANGE_END + 1):
+            # Resume: don't rescan ports a previous run already finished
+            if result_sink.is_done(TARGET_HOST, port):
+                skipped += 1
+                continue
+            thread = threading.Thread(target=port_scan_worker, args=(port, result_sink))
+            threads.append(thread)
+            thread.start()
+            
+        print("\n--- Main program waiting for all threads to finish scanning... ---")
+        for thread in threads:
+            thread.join()
+    finally:
+        # Always save the final checkpoint, even on Ctrl+C
+        result_sink.close()
         
     end_time = time.time()
     
     # --- FINAL SUMMARY UPDATE ---
     
-    # Sort the results by port number for clean display
-    sorted_ports = sorted(open_ports, key=lambda x: x[0])
+    # Sort the results by port number for clean display (includes earlier runs when resuming)
+    sorted_ports = sorted(result_sink.open_ports, key=lambda x: x[0])
     
     print("\n" + "=" * 40)
     print("✅ Scan Complete!")
     print(f"Total time taken: {end_time - start_time:.2f} seconds")
+    if skipped:
+        print(f"Skipped {skipped} ports already finished in a previous run.")
+    if args.output:
+        print(f"Results streamed to: {args.output}")
     print("-" * 40)
     
     if sorted_ports:
@@ -144,5 +390,25 @@ if __name__ == "__main__":
             print(f"  Port {port:<5}: {service}")
     else:
         print("No open ports found in the scanned range.")
+
+    # --- DATABASE STORAGE + DIFF AGAINST THE PREVIOUS RUN ---
+    if db_manager:
+        db_manager.save_scan_results(scan_run_id, sorted_ports)
+        db_manager.finish_scan_run(scan_run_id)
+        scan_diff = db_manager.diff_scan_runs(scan_run_id)
+        db_manager.close()
+
+        print("-" * 40)
+        print(f"Saved as scan run {scan_run_id} in {args.db}")
+        if scan_diff['previous_run'] is None:
+            print("No previous run of this target to compare with.")
+        elif not scan_diff['opened'] and not scan_diff['closed']:
+            print(f"No changes since scan run {scan_diff['previous_run']}.")
+        else:
+            print(f"Changes since scan run {scan_diff['previous_run']}:")
+            for port, service in scan_diff['opened']:
+                print(f"  + Port {port:<5} newly OPEN ({service})")
+            for port, service in scan_diff['closed']:
+                print(f"  - Port {port:<5} now CLOSED ({service})")
         
     print("=" * 40)